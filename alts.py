@@ -174,4 +174,4 @@ df_beta_revert = df_beta_revert.loc[:, 'U.S. Equity']
 df_alts_returns_nonus_ir['Expected Return'] = equity_calcs.cash/100 + (equity_calcs.equity_returns_nonus['U.S. Equity']/100 - equity_calcs.cash/100)\
     * df_beta_revert + df_alts_returns_nonus_ir['Information Ratio'] * df_alts_returns_nonus_ir['Residual Risk']
 
-alts_returns_nonus = (df_alts_returns_nonus_ir['Expected Return']*100).round(1)      
+alts_returns_nonus = df_alts_returns_nonus_ir['Expected Return']*100      
@@ -0,0 +1,364 @@
+import json
+import os
+import re
+
+from datetime import date
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+# Assumptions the model reads from cma_gui.val_dict, kept apart from the GUI so runs without a display can build the
+# same val_dict. The GUI takes its defaults from here.
+
+currencies = ['AUD', 'CAD', 'CHF','DKK', 'EUR', 'GBP', 'JPY', 'NOK', 'NZD', 'SEK', 'USD']
+
+# Latest month end, the end date of every data pull
+end_date = date(date.today().year, date.today().month, 1) - relativedelta(days=1)
+
+# Default building block inputs as val_dict key: value
+building_blocks = {
+    'currency': 'USD',
+    'lambda_val': 0.99,
+    'us_inflation': 2.2,
+    'gl_inflation': 1.8,
+    'gl_exus_inflation': 1.6,
+    'em_inflation': 3.0,
+    'country_inflation': 2.1,
+    'us_rcr': 0.5,
+    'gl_rcr': 0.5,
+    'gl_exus_rcr': 0.5,
+    'em_rcr': 2.0,
+    'us_reg': 2.0,
+    'gl_exus_reg': 1.5,
+    'em_reg': 3.8,
+    'us_real_gdp': 2.0,
+    'europe_ex_uk_real_gdp': 1.5,
+    'uk_real_gdp': 1.7,
+    'japan_real_gdp': 0.8,
+    'apac_ex_japan_real_gdp': 2.6,
+    'em_real_gdp': 3.8,
+    'us_equity_val': -0.5,
+    'gl_exus_equity_val': -0.30,
+    'europe_ex_uk_equity_val': -0.25,
+    'uk_equity_val': -0.25,
+    'japan_equity_val': -0.25,
+    'apac_ex_japan_equity_val': -0.25,
+    'em_equity_val': 0.00,
+    'us_equity_income': 1.9,
+    'gl_exus_equity_income': 2.8,
+    'europe_ex_uk_equity_income': 3.1,
+    'uk_equity_income': 3.5,
+    'japan_equity_income': 1.7,
+    'apac_ex_japan_equity_income': 3.8,
+    'em_equity_income': 2.5,
+    'us_equity_buyback': 0.7,
+    'gl_exus_equity_buyback': 0.0,
+    'europe_ex_uk_equity_buyback': 0.0,
+    'uk_equity_buyback': -0.0,
+    'japan_equity_buyback': -0.0,
+    'apac_ex_japan_equity_buyback': -0.0,
+    'em_equity_buyback': -0.0,
+    'term_prem_3mo': 0.00,
+    'term_prem_5yr': 0.75,
+    'term_prem_10yr': 1.0,
+    'term_prem_30yr': 1.25,
+    'us_theme_tp_adjust': 0,
+    'gl_theme_tp_adjust': 0,
+    'gl_exus_theme_tp_adjust': 0.25,
+    'em_theme_tp_adjust': 0,
+    'yield_norm_yrs': 3,
+    'gl_yield_norm_yrs': 5,
+    'em_yield_norm_yrs': 5,
+    'spread_norm_yrs': 5,
+    }
+
+# Equity Data
+equity_us_base = {
+    'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To'],
+    'U.S. Equity': 
+         ['RU30INTR Index', 'Building Blocks'],
+    'U.S. Large Cap Equity': 
+         ['RU10INTR Index', 'U.S. Equity'],
+    'U.S. Mid Cap Equity': 
+         ['RUMCINTR Index', 'U.S. Equity'],
+    'U.S. Small Cap Equity': 
+         ['RU20INTR Index', 'U.S. Equity'],
+    'U.S. Micro Cap Equity': 
+         ['DWMIT Index', 'U.S. Equity'],
+    'Global Equity': 
+         ['GDUEACWF Index', 'Building Blocks'],
+    'International Developed Equity': 
+         ['GDUEACWZ Index', 'Building Blocks'],
+    'International Small Cap Equity': 
+         ['GCUDWXUS Index', 'International Developed Equity'],
+    'Global Emerging Markets Equity': 
+         ['GDUEEGF Index', 'Building Blocks'],
+    }
+
+equity_nonus_base = {
+    'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To'],
+    'U.S. Equity': 
+        ['GDDUUS Index', 'Building Blocks'],
+    'U.S. Small Cap Equity': 
+        ['GCUDUS Index', 'U.S. Equity'],
+    'Europe Ex-UK Equity': 
+        ['GDDUE15X Index', 'Building Blocks'],
+    'Europe Small Cap Equity': 
+        ['GCUDE15 Index', 'Europe Ex-UK Equity'],
+    'UK Equity': 
+        ['GDDUUK Index', 'Building Blocks'],
+    'Japan Equity': 
+        ['GDDUJN Index', 'Building Blocks'],
+    'Japan Small Cap Equity': 
+        ['GCUAJN Index', 'Japan Equity'],
+    'Developed Market Pacific Ex-Japan Equity': 
+        ['GDDUPXJ Index', 'Building Blocks'],
+    'Global Emerging Markets Equity': 
+        ['GDUEEGF Index', 'Building Blocks'],
+    }
+
+# Fixed Income Data
+# USD
+fixed_us_base = {
+     'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To', 'Term Structure (%)', 'Default Rate(%)', 'Recovery Rate (%)'],
+     'U.S. Aggregate': 
+        ['LBUSTRUU Index', 'N/A', 'US', 0.15, 50.0],
+     'U.S. Treasury': 
+        ['LUATTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. Treasury Bills': 
+        ['LD21TRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. Intermediate Treasury': 
+        ['LT08TRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. Long Treasury': 
+        ['LUTLTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. Investment Grade Credit': 
+        ['LUCRTRUU Index', 'N/A', 'US', 0.29, 50.0],
+     'U.S. Intermediate Investment Grade Credit': 
+        ['LUICTRUU Index', 'N/A', 'US', 0.29, 50.0],
+     'U.S. Long Investment Grade Credit': 
+        ['LULCTRUU Index', 'N/A', 'US', 0.29, 50.0],
+     'U.S. TIPS': 
+        ['BCIT1T Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. Agencies': 
+        ['BUAGTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
+     'U.S. MBS': 
+        ['LUMSTRUU Index', 'N/A', 'US', 0.10, 50.0],
+     'U.S. Investment Grade CMBS': 
+        ['LC09TRUU Index', 'N/A', 'US', 0.50, 50.0],
+     'U.S. Intermediate Municipal': 
+        ['I00777US Index', 'N/A', 'US', 0.10, 50.0],
+     'U.S. Short Municipal': 
+        ['I00779US Index', 'N/A', 'US', 0.10, 50.0],
+     'U.S. High Yield': 
+        ['LF98TRUU Index', 'N/A', 'US', 3.50, 40.0],
+     'U.S. Bank Loans': 
+        ['SPBDAL Index', 'N/A', 'US', 3.50, 60.0],
+     'Global Aggregate Ex-US': 
+        ['LG38TRUU Index', 'N/A', 'NonUS', 0.20, 50.0],
+     'Global Treasury Ex-US': 
+        ['LGT1TRUU Index', 'Global Aggregate Ex-US', 'NonUS', 0.15, 50.0],
+     'Global Corporate Ex-US':
+        ['I16598 Index', 'Global Aggregate Ex-US', 'NonUS', 0.30, 50.0],
+     'Emerging Markets Sovereign USD': 
+        ['BSSUTRUU Index', 'Global Aggregate Ex-US', 'US', 0.85, 50.0],
+     'Emerging Markets Corporate USD': 
+        ['BSEKTRUU Index', 'Global Aggregate Ex-US', 'US', 1.40, 50.0],
+     'Emerging Markets Sovereign Local Currency': 
+        ['EMLCTRUU Index', 'Global Aggregate Ex-US', 'EM', 0.85, 50.0],
+    }
+
+# Non USD
+fixed_nonus_base = {
+    'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To', 'Term Structure (%)', 'Default Rate(%)', 'Recovery Rate (%)'],
+     'Global Developed Market Sovereign Fixed Income': 
+        ['LGTRTRUU Index', 'Global Developed Market Aggregate Fixed Income', 'NonUS', 0.15, 50.0],
+     'Global Developed Market Aggregate Fixed Income': 
+        ['LEGATRUU Index', 'N/A', 'NonUS', 0.20, 50.0],
+     'Global High Yield Fixed Income': 
+        ['LG30TRUU Index', 'N/A', 'NonUS', 3.50, 40.0],
+     'Emerging Markets Local Currency Fixed Income': 
+        ['EMLCTRUU Index', 'Emerging Debt Agg USD', 'EM', 0.85, 50.0],
+     'Emerging Markets Sovereign Fixed Income USD': 
+        ['BSSUTRUU Index', 'Emerging Debt Agg USD', 'US', 0.85, 50.0],
+     'Emerging Markets Corporate Fixed Income': 
+        ['BSEKTRUU Index', 'Emerging Debt Agg USD', 'US', 1.40, 50.0],
+    }
+
+# Alts Data
+alts_us_base = {
+    'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To', 'Information Ratio'],
+    'Absolute Return': 
+        ['HFRXGL Index', 'Global Equity', 0.30],
+    'Hedge Funds': 
+        ['HFRIFWI Index', 'Global Equity', 0.30],
+    'Hedge Funds - Equity Hedge': 
+        ['HFRIEHI Index', 'Global Equity', 0.30],
+    'Hedge Funds - Event Driven':
+        ['HFRIEDI Index', 'Global Equity', 0.30],
+    'Hedge Funds - Macro': 
+        ['HFRIMI Index', 'Global Equity', 0.30],
+    'Hedge Funds - Relative Value':
+        ['HFRIRVA Index', 'Global Equity', 0.30],
+    'Hedge Funds - Managed Futures':
+        ['CSLABMF Index', 'Global Equity', 0.30],
+    'Commodities':
+        ['BCOMTR Index', 'Building Blocks', 'N/A'],
+    'Global Natural Resources Equity': 
+        ['SPGNRUT Index', 'U.S. Equity', 'N/A'],
+    'U.S. REIT': 
+        ['FNERTR Index', 'U.S. Equity', 'N/A'],
+    'Global REIT': 
+        ['RUGL Index', 'Global Equity', 'N/A'],
+    'Energy Infrastructure': 
+        ['AMZX Index', 'Commodities', 0.25],
+    }
+
+alts_nonus_base = {
+    'Asset Class': 
+        ['Bloomberg Code', 'Beta Relative To', 'Information Ratio'],
+    'Long-Short Equity': 
+        ['HFRIEHI Index', 'U.S. Equity', 0.30],
+    'Global Macro': 
+        ['HFRIMI Index', 'U.S. Equity', 0.30],
+    }
+
+# Asset class tables in val_dict as prefix: (base table, val_dict key suffix of each column)
+tables = {
+    'equity_us': (equity_us_base, ['code', 'beta']),
+    'equity_nonus': (equity_nonus_base, ['code', 'beta']),
+    'fixed_us': (fixed_us_base, ['code', 'beta', 'term', 'default', 'recover']),
+    'fixed_nonus': (fixed_nonus_base, ['code', 'beta', 'term', 'default', 'recover']),
+    'alts_us': (alts_us_base, ['code', 'beta', 'ir']),
+    'alts_nonus': (alts_nonus_base, ['code', 'beta', 'ir']),
+    }
+
+# Blank rows the GUI adds to each table for extra asset classes
+extra_rows = 2
+
+# Text the number columns of the tables take instead of a number, N/A where a rate does not apply and blank in the
+# blank rows
+table_placeholders = ['N/A', '']
+
+
+def default_values(as_of_date=None):
+    """ val_dict as the GUI returns it when Calculate is pressed without changing anything
+
+    The GUI has no default as of date, the latest month end is used unless one is given.
+    """
+    val_dict = {'as_of_date': as_of_date or end_date.strftime('%m-%d-%Y')}
+    val_dict.update(building_blocks)
+    for prefix, (base, columns) in tables.items():
+        rows = list(base.items())[1:] + [('', [''] * len(columns))] * extra_rows
+        for i, (name, values) in enumerate(rows, 1):
+            val_dict[prefix + '_name' + str(i)] = name
+            for column, value in zip(columns, values):
+                val_dict[prefix + '_' + column + str(i)] = value
+    return val_dict
+
+
+def value_type(value):
+    """ 'number' or 'text', None for anything else such as lists or booleans """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'text'
+    return None
+
+
+def column_type(prefix, column):
+    """ 'number' if a column of an asset class table holds numbers in its base table, 'text' otherwise """
+    base, columns = tables[prefix]
+    if column != 'name' and any(value_type(x[columns.index(column)]) == 'number' for x in list(base.values())[1:]):
+        return 'number'
+    return 'text'
+
+
+def check_value(key, value, kind, placeholders=()):
+    """ Raise if a value is not of the kind given, text in placeholders standing in for a number """
+    if value_type(value) != kind and not (kind == 'number' and value in placeholders):
+        expected = ' or '.join([kind] + [json.dumps(x) for x in placeholders]) if kind == 'number' else kind
+        raise ValueError(key + ' must be ' + expected + ', got ' + json.dumps(value, default=str))
+
+
+def check_setting(key, value, default):
+    """ Raise if a val_dict value is not of the type of the key's default, or of its column for the asset class tables """
+    for prefix, (base, columns) in tables.items():
+        cell = re.fullmatch(prefix + '_(name|' + '|'.join(columns) + r')\d+', key)
+        if cell:
+            check_value(key, value, column_type(prefix, cell.group(1)), table_placeholders)
+            return
+    check_value(key, value, value_type(default))
+
+
+def set_rows(val_dict, prefix, rows):
+    """ Change or add rows of an asset class table from a dictionary of asset class: [column values] """
+    base, columns = tables[prefix]
+    if not isinstance(rows, dict):
+        raise ValueError(prefix + ' must be a dictionary of asset class: [' + ', '.join(columns) + ']')
+
+    names = {v: k[len(prefix + '_name'):] for (k, v) in val_dict.items() if k.startswith(prefix + '_name') and v}
+    for name, values in rows.items():
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(prefix + ' ' + name + ' needs ' + str(len(columns)) + ' values: ' + ', '.join(columns))
+        for column, value in zip(columns, values):
+            check_value(prefix + ' ' + name + ' ' + column, value, column_type(prefix, column), table_placeholders)
+
+        # New asset classes go in the first blank row, or a row added after the last one
+        i = names.get(name)
+        if i is None:
+            blank = [k[len(prefix + '_name'):] for (k, v) in val_dict.items() if k.startswith(prefix + '_name') and not v]
+            i = blank[0] if blank else str(sum(k.startswith(prefix + '_name') for k in val_dict) + 1)
+            names[name] = i
+
+        val_dict[prefix + '_name' + i] = name
+        for column, value in zip(columns, values):
+            val_dict[prefix + '_' + column + i] = value
+
+
+def load_file(file):
+    """ Assumptions from a JSON or YAML file """
+    with open(file) as f:
+        if os.path.splitext(file)[1].lower() in ('.yaml', '.yml'):
+            # Imported here so JSON files work on machines without PyYAML
+            import yaml
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def build_val_dict(*settings):
+    """ val_dict from the defaults updated with each dictionary of settings in turn
+
+    Settings use the val_dict keys, apart from the asset class tables, which are given by their prefix as a dictionary
+    of asset class: [column values] in the layout of the base tables above. Values must be of the type of the defaults,
+    a ValueError is raised otherwise.
+    """
+    settings = [dict(x) for x in settings]
+    as_of_date = ([None] + [x.pop('as_of_date') for x in settings if x.get('as_of_date')])[-1]
+    if as_of_date is not None:
+        try:
+            datetime.strptime(str(as_of_date), '%m-%d-%Y')
+        except ValueError:
+            raise ValueError('as_of_date must be a date as mm-dd-yyyy, got ' + str(as_of_date)) from None
+    val_dict = default_values(as_of_date)
+
+    for setting in settings:
+        unknown = [x for x in setting if x not in val_dict and x not in tables]
+        if unknown:
+            raise ValueError('Unknown assumptions: ' + ', '.join(unknown))
+
+        for key, value in setting.items():
+            if key in tables:
+                set_rows(val_dict, key, value)
+            else:
+                check_setting(key, value, val_dict[key])
+                val_dict[key] = value
+
+    if val_dict['currency'] not in currencies:
+        raise ValueError('Unknown currency ' + str(val_dict['currency']) + ', expected one of ' + ', '.join(currencies))
+    return val_dict
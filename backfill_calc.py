@@ -15,6 +15,7 @@
 
 # +
 import cma_gui as cma
+import data_store
 import numpy as np
 import pandas as pd
 
@@ -33,11 +34,11 @@ first_date = last_date - relativedelta(years=20) + relativedelta(months=1)
 def returns_dataframe(file_suffix):
     """ Combine all return streams and combine into one dataframe for beta backfill calculations """
     
-    file = r"P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_" + file_suffix + ".xlsx"
+    workbook = 'bloomberg_data_' + file_suffix
     
-    df_equity = pd.read_excel(file, sheet_name='equity_returns', index_col=0)
-    df_fixed = pd.read_excel(file, sheet_name='fixed_returns', index_col=0)
-    df_alts = pd.read_excel(file, sheet_name='alts_returns', index_col=0)
+    df_equity = data_store.load_dataset(workbook, 'equity_returns')
+    df_fixed = data_store.load_dataset(workbook, 'fixed_returns')
+    df_alts = data_store.load_dataset(workbook, 'alts_returns')
 
     # Combine all index values into single dataframe
     df_returns = df_equity.join(df_fixed, how="outer").join(df_alts, how="outer")
@@ -90,22 +91,17 @@ df_returns_us = returns_dataframe('us')
 df_backfill_us = backfill_determination(df_returns_us, 'us')
 backfill_calc(df_returns_us, df_backfill_us)
 
-df_returns_us.to_csv(
-    r"P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_us.csv")
+data_store.save_returns(df_returns_us, 'us')
 # -
 
 # # Non-USD
 
 # +
 # Import index values
-df_equity_nonus = pd.read_excel(
-    "P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx", sheet_name='equity_returns', index_col=0)
-df_fixed_nonus = pd.read_excel(
-    "P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx", sheet_name='fixed_returns', index_col=0)
-df_alts_nonus = pd.read_excel(
-    "P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx", sheet_name='alts_returns', index_col=0)
-df_currency = pd.read_excel(
-    "P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx", sheet_name='currencies', index_col=0)
+df_equity_nonus = data_store.load_dataset('bloomberg_data_nonus', 'equity_returns')
+df_fixed_nonus = data_store.load_dataset('bloomberg_data_nonus', 'fixed_returns')
+df_alts_nonus = data_store.load_dataset('bloomberg_data_nonus', 'alts_returns')
+df_currency = data_store.load_dataset('bloomberg_data_nonus', 'currencies')
 
 # Combine all index values into single dataframe
 df_index_nonus = df_equity_nonus.join(df_fixed_nonus, how="outer").join(df_alts_nonus, how="outer")
@@ -132,7 +128,6 @@ df_backfill_nonus = backfill_determination(df_returns_nonus, 'nonus')
 backfill_calc(df_returns_nonus, df_backfill_nonus)
 df_returns_nonus
 
-df_returns_nonus.to_csv(
-    r"P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_nonus.csv")
+data_store.save_returns(df_returns_nonus, 'nonus')
 
 
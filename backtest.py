@@ -0,0 +1,88 @@
+import data_store
+import os
+import pandas as pd
+import pipeline
+import report
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+
+def month_ends(start, end):
+    """ Month end as of dates from start to end, in the mm-dd-yyyy format of val_dict """
+    return [x.strftime('%m-%d-%Y') for x in pd.date_range(start, end, freq='M')]
+
+
+def returns_folder(as_of_date):
+    """ Folder for the backfilled returns of one as of date, so months never overwrite each other or the live files. It
+    is removed once the month's tables are built, the stage cache keeps the files for a later run of the same month.
+    """
+    return os.path.join(data_store.store_folder, 'backtest', as_of_date)
+
+
+def run_month(as_of_date, skip=('data_pull',)):
+    """ Final tables for one as of date as a panel of as_of_date, region, asset class, metric and value """
+    import cma_gui as cma
+
+    start = (cma.val_dict['as_of_date'], data_store.returns_folder)
+    try:
+        cma.val_dict['as_of_date'] = as_of_date
+        data_store.returns_folder = returns_folder(as_of_date)
+        outputs = pipeline.run(skip=skip)
+        tables = {'US': report.final_us(outputs, cma.val_dict), 'NonUS': report.final_nonus(outputs, cma.val_dict)}
+    finally:
+        cma.val_dict['as_of_date'], data_store.returns_folder = start
+        data_store.remove_folder(returns_folder(as_of_date))
+
+    panel = pd.concat(tables, names=['Region', 'Asset Class']).rename_axis(columns='Metric').stack().rename('Value')
+    panel = panel.reset_index()
+    panel.insert(0, 'as_of_date', datetime.strptime(as_of_date, '%m-%d-%Y'))
+    return panel
+
+
+def backtest_panels(dates, skip=('data_pull',), max_workers=1):
+    """ Generator of the panel of each as of date in dates, in the order they finish. Months the model fails for, for
+    example from gaps in the history, are reported and left out.
+
+    With max_workers above one the months are spread over worker processes. Each worker parses the stored history
+    once and keeps it for all of its months. Every month already run with the same data and assumptions is taken from
+    the stage cache.
+    """
+    import cma_gui as cma
+
+    if max_workers == 1:
+        try:
+            for as_of_date in dates:
+                try:
+                    yield run_month(as_of_date, skip)
+                except Exception as e:
+                    print('Backtest skipped ' + as_of_date + ': ' + repr(e))
+        finally:
+            # The stages in memory were run for other as of dates and other returns files
+            pipeline.results.clear()
+            pipeline.stage_reads.clear()
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=pipeline.install_inputs,
+                             initargs=(cma.val_dict, cma.end_date)) as executor:
+        futures = {executor.submit(run_month, x, skip): x for x in dates}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print('Backtest skipped ' + futures[future] + ': ' + repr(e))
+
+
+def backtest(start, end=None, skip=('data_pull',), max_workers=1):
+    """ Final tables for every month end from start to end, the as of date in cma.val_dict by default
+
+    Returns a panel of as_of_date, region, asset class, metric and value, also saved to Data/output/backtest.parquet.
+    Everything but the as of date is taken from cma.val_dict.
+    """
+    import cma_gui as cma
+
+    end = end or datetime.strptime(cma.val_dict['as_of_date'], '%m-%d-%Y')
+    panels = list(backtest_panels(month_ends(start, end), skip, max_workers))
+    panel = pd.concat(panels).sort_values('as_of_date', kind='stable').reset_index(drop=True)
+    data_store.save_panel('backtest', panel)
+    return panel
@@ -0,0 +1,98 @@
+import argparse
+import assumptions
+import data_store
+import json
+import pipeline
+import providers
+import report
+
+
+def parse_setting(setting):
+    """ key=value from the command line, with the value read as JSON when it parses and as a string otherwise """
+    key, sep, value = setting.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError('expected key=value, got ' + setting)
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def parse_batch(setting):
+    """ currency=inflation for --batch, the currency being one the model produces """
+    currency, inflation = parse_setting(setting)
+    if currency not in assumptions.currencies:
+        raise argparse.ArgumentTypeError('unknown currency ' + currency + ', choose from '
+                                         + ', '.join(assumptions.currencies))
+    return currency, inflation
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Run the capital market assumptions without the GUI')
+    parser.add_argument('--config', action='append', default=[],
+                        help='JSON or YAML file of assumptions, later files override earlier ones')
+    parser.add_argument('--set', action='append', default=[], type=parse_setting, metavar='KEY=VALUE',
+                        help='Assumption by its val_dict key, for example --set us_inflation=2.4')
+    parser.add_argument('--as-of-date', help='As of date as mm-dd-yyyy, the latest month end by default')
+    parser.add_argument('--currency', choices=assumptions.currencies)
+    parser.add_argument('--country-inflation', type=float)
+    parser.add_argument('--lambda', dest='lambda_val', type=float)
+    parser.add_argument('--batch', action='append', default=[], type=parse_batch, metavar='CURRENCY=INFLATION',
+                        help='Also produce this currency with its country inflation, can be repeated')
+    parser.add_argument('--pull', choices=['auto', 'always', 'never'], default='auto',
+                        help='Pull new data when the stored data is out of date (auto), always or never')
+    parser.add_argument('--provider', choices=list(providers.providers), help='Data provider for the pull')
+    parser.add_argument('--serial', action='store_true',
+                        help='Run the US and Non-US branches in this process, always the case with --batch')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='Run every stage instead of taking unchanged stages from the stage cache')
+    parser.add_argument('--show', action='store_true', help='Print the assumptions as JSON and exit')
+    return parser.parse_args(args)
+
+
+def build_val_dict(args):
+    """ val_dict from the config files, then --set, then the named flags """
+    flags = {'as_of_date': args.as_of_date, 'currency': args.currency, 'country_inflation': args.country_inflation,
+             'lambda_val': args.lambda_val}
+    settings = [assumptions.load_file(x) for x in args.config]
+    settings.append(dict(args.set))
+    settings.append({k: v for (k, v) in flags.items() if v is not None})
+    return assumptions.build_val_dict(*settings)
+
+
+def main(args=None):
+    args = parse_args(args)
+    val_dict = build_val_dict(args)
+    batch_currencies = dict(args.batch)
+    if args.show:
+        print(json.dumps(val_dict, indent=4))
+        return
+
+    pipeline.install_inputs(val_dict, assumptions.end_date)
+    if args.provider:
+        providers.default_provider = args.provider
+
+    # Check if new data needs to be pulled
+    data_needed = args.pull == 'always' or (args.pull == 'auto' and data_store.data_needed(val_dict))
+    skip = [] if data_needed else ['data_pull']
+
+    # A batch reuses the stage results held in this process, which the worker processes of run_branches do not leave
+    if args.serial or batch_currencies:
+        outputs = pipeline.run(skip=skip, cache=args.cache)
+    else:
+        outputs = pipeline.run_branches(skip=skip, cache=args.cache)
+    print('New data pulled' if data_needed else 'No new data needed')
+
+    report.save_report(val_dict['currency'], outputs, val_dict)
+    print('Saved ' + data_store.output_file('cma_' + val_dict['currency']))
+
+    if batch_currencies:
+        batch = pipeline.run_currencies(batch_currencies, skip=['data_pull'])
+        for currency, currency_outputs in batch.items():
+            report.save_report(currency, currency_outputs,
+                               dict(val_dict, currency=currency, country_inflation=batch_currencies[currency]))
+            print('Saved ' + data_store.output_file('cma_' + currency))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,19 +15,19 @@
 
 # %%
 from datetime import datetime
-from datetime import date
 from dateutil.relativedelta import relativedelta
 from dateutil.rrule import rrule, MONTHLY
 import numpy as np
 import pandas as pd
 import PySimpleGUI as sg
 
+from assumptions import building_blocks, currencies, end_date
+from assumptions import equity_us_base, equity_nonus_base, fixed_us_base, fixed_nonus_base, alts_us_base, alts_nonus_base
+
 # %% [markdown]
 # # Variables
 
 # %%
-currencies = ['AUD', 'CAD', 'CHF','DKK', 'EUR', 'GBP', 'JPY', 'NOK', 'NZD', 'SEK', 'USD']
-
 value_range = [float(f'{i:.2f}') for i in list(np.arange(-5.0, 5.1, 0.05))]
 value_range.insert(0, 0.0)
 
@@ -38,7 +38,6 @@ recovery_val = ['', 'N/A'] + [float(f'{i:.1f}') for i in list(np.arange(0, 105,
 ir_val = ['', 'N/A'] + [float(f'{i:.2f}') for i in list(np.arange(0, 1.01, 0.01))]
 
 # %%
-end_date = date(date.today().year, date.today().month, 1) - relativedelta(days=1)
 start_date = end_date - relativedelta(years=1)
 
 as_of_date = pd.date_range(start_date, end_date, freq='M').strftime('%m-%d-%Y').tolist()
@@ -49,52 +48,6 @@ as_of_date = pd.date_range(start_date, end_date, freq='M').strftime('%m-%d-%Y').
 # %%
 beta_equity = ['', 'Building Blocks', 'Europe Ex-UK Equity', 'International Developed Equity', 'Japan Equity', 'U.S. Equity']
 
-equity_us_base = {
-    'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To'],
-    'U.S. Equity': 
-         ['RU30INTR Index', 'Building Blocks'],
-    'U.S. Large Cap Equity': 
-         ['RU10INTR Index', 'U.S. Equity'],
-    'U.S. Mid Cap Equity': 
-         ['RUMCINTR Index', 'U.S. Equity'],
-    'U.S. Small Cap Equity': 
-         ['RU20INTR Index', 'U.S. Equity'],
-    'U.S. Micro Cap Equity': 
-         ['DWMIT Index', 'U.S. Equity'],
-    'Global Equity': 
-         ['GDUEACWF Index', 'Building Blocks'],
-    'International Developed Equity': 
-         ['GDUEACWZ Index', 'Building Blocks'],
-    'International Small Cap Equity': 
-         ['GCUDWXUS Index', 'International Developed Equity'],
-    'Global Emerging Markets Equity': 
-         ['GDUEEGF Index', 'Building Blocks'],
-    }
-
-equity_nonus_base = {
-    'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To'],
-    'U.S. Equity': 
-        ['GDDUUS Index', 'Building Blocks'],
-    'U.S. Small Cap Equity': 
-        ['GCUDUS Index', 'U.S. Equity'],
-    'Europe Ex-UK Equity': 
-        ['GDDUE15X Index', 'Building Blocks'],
-    'Europe Small Cap Equity': 
-        ['GCUDE15 Index', 'Europe Ex-UK Equity'],
-    'UK Equity': 
-        ['GDDUUK Index', 'Building Blocks'],
-    'Japan Equity': 
-        ['GDDUJN Index', 'Building Blocks'],
-    'Japan Small Cap Equity': 
-        ['GCUAJN Index', 'Japan Equity'],
-    'Developed Market Pacific Ex-Japan Equity': 
-        ['GDDUPXJ Index', 'Building Blocks'],
-    'Global Emerging Markets Equity': 
-        ['GDUEEGF Index', 'Building Blocks'],
-    }
-
 # %% [markdown]
 # # Fixed Income Data
 
@@ -102,118 +55,12 @@ equity_nonus_base = {
 beta_fixed = ['', 'N/A', 'Emerging Debt Agg USD', 'Global Aggregate Ex-US', 'Global Developed Market Aggregate Fixed Income']
 term_struc = ['', 'N/A', 'EM', 'NonUS', 'US']
 
-# USD
-fixed_us_base = {
-     'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To', 'Term Structure (%)', 'Default Rate(%)', 'Recovery Rate (%)'],
-     'U.S. Aggregate': 
-        ['LBUSTRUU Index', 'N/A', 'US', 0.15, 50.0],
-     'U.S. Treasury': 
-        ['LUATTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. Treasury Bills': 
-        ['LD21TRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. Intermediate Treasury': 
-        ['LT08TRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. Long Treasury': 
-        ['LUTLTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. Investment Grade Credit': 
-        ['LUCRTRUU Index', 'N/A', 'US', 0.29, 50.0],
-     'U.S. Intermediate Investment Grade Credit': 
-        ['LUICTRUU Index', 'N/A', 'US', 0.29, 50.0],
-     'U.S. Long Investment Grade Credit': 
-        ['LULCTRUU Index', 'N/A', 'US', 0.29, 50.0],
-     'U.S. TIPS': 
-        ['BCIT1T Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. Agencies': 
-        ['BUAGTRUU Index', 'N/A', 'US', 'N/A', 'N/A'],
-     'U.S. MBS': 
-        ['LUMSTRUU Index', 'N/A', 'US', 0.10, 50.0],
-     'U.S. Investment Grade CMBS': 
-        ['LC09TRUU Index', 'N/A', 'US', 0.50, 50.0],
-     'U.S. Intermediate Municipal': 
-        ['I00777US Index', 'N/A', 'US', 0.10, 50.0],
-     'U.S. Short Municipal': 
-        ['I00779US Index', 'N/A', 'US', 0.10, 50.0],
-     'U.S. High Yield': 
-        ['LF98TRUU Index', 'N/A', 'US', 3.50, 40.0],
-     'U.S. Bank Loans': 
-        ['SPBDAL Index', 'N/A', 'US', 3.50, 60.0],
-     'Global Aggregate Ex-US': 
-        ['LG38TRUU Index', 'N/A', 'NonUS', 0.20, 50.0],
-     'Global Treasury Ex-US': 
-        ['LGT1TRUU Index', 'Global Aggregate Ex-US', 'NonUS', 0.15, 50.0],
-     'Global Corporate Ex-US':
-        ['I16598 Index', 'Global Aggregate Ex-US', 'NonUS', 0.30, 50.0],
-     'Emerging Markets Sovereign USD': 
-        ['BSSUTRUU Index', 'Global Aggregate Ex-US', 'US', 0.85, 50.0],
-     'Emerging Markets Corporate USD': 
-        ['BSEKTRUU Index', 'Global Aggregate Ex-US', 'US', 1.40, 50.0],
-     'Emerging Markets Sovereign Local Currency': 
-        ['EMLCTRUU Index', 'Global Aggregate Ex-US', 'EM', 0.85, 50.0],
-    }
-
-# Non USD
-fixed_nonus_base = {
-    'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To', 'Term Structure (%)', 'Default Rate(%)', 'Recovery Rate (%)'],
-     'Global Developed Market Sovereign Fixed Income': 
-        ['LGTRTRUU Index', 'Global Developed Market Aggregate Fixed Income', 'NonUS', 0.15, 50.0],
-     'Global Developed Market Aggregate Fixed Income': 
-        ['LEGATRUU Index', 'N/A', 'NonUS', 0.20, 50.0],
-     'Global High Yield Fixed Income': 
-        ['LG30TRUU Index', 'N/A', 'NonUS', 3.50, 40.0],
-     'Emerging Markets Local Currency Fixed Income': 
-        ['EMLCTRUU Index', 'Emerging Debt Agg USD', 'EM', 0.85, 50.0],
-     'Emerging Markets Sovereign Fixed Income USD': 
-        ['BSSUTRUU Index', 'Emerging Debt Agg USD', 'US', 0.85, 50.0],
-     'Emerging Markets Corporate Fixed Income': 
-        ['BSEKTRUU Index', 'Emerging Debt Agg USD', 'US', 1.40, 50.0],
-    }
-
 # %% [markdown]
 # ## Alts Data
 
 # %%
 beta_alts = ['', 'N/A', 'Building Blocks', 'Commodities', 'Global Equity', 'U.S. Equity']
 
-alts_us_base = {
-    'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To', 'Information Ratio'],
-    'Absolute Return': 
-        ['HFRXGL Index', 'Global Equity', 0.30],
-    'Hedge Funds': 
-        ['HFRIFWI Index', 'Global Equity', 0.30],
-    'Hedge Funds - Equity Hedge': 
-        ['HFRIEHI Index', 'Global Equity', 0.30],
-    'Hedge Funds - Event Driven':
-        ['HFRIEDI Index', 'Global Equity', 0.30],
-    'Hedge Funds - Macro': 
-        ['HFRIMI Index', 'Global Equity', 0.30],
-    'Hedge Funds - Relative Value':
-        ['HFRIRVA Index', 'Global Equity', 0.30],
-    'Hedge Funds - Managed Futures':
-        ['CSLABMF Index', 'Global Equity', 0.30],
-    'Commodities':
-        ['BCOMTR Index', 'Building Blocks', 'N/A'],
-    'Global Natural Resources Equity': 
-        ['SPGNRUT Index', 'U.S. Equity', 'N/A'],
-    'U.S. REIT': 
-        ['FNERTR Index', 'U.S. Equity', 'N/A'],
-    'Global REIT': 
-        ['RUGL Index', 'Global Equity', 'N/A'],
-    'Energy Infrastructure': 
-        ['AMZX Index', 'Commodities', 0.25],
-    }
-
-alts_nonus_base = {
-    'Asset Class': 
-        ['Bloomberg Code', 'Beta Relative To', 'Information Ratio'],
-    'Long-Short Equity': 
-        ['HFRIEHI Index', 'U.S. Equity', 0.30],
-    'Global Macro': 
-        ['HFRIMI Index', 'U.S. Equity', 0.30],
-    }
-
 # %%
 sg.SetOptions(element_padding=(1, 1))
 bw = {'size': (20,1)}
@@ -224,9 +71,9 @@ build_layout = [[sg.T('', **bw)],
               [sg.T('As of Date', **bw), 
                sg.Combo(values=as_of_date, **bw, key='as_of_date'),
                sg.T('Currency', **bw), 
-               sg.Combo(values=currencies, default_value='USD', **bw, key='currency'),
+               sg.Combo(values=currencies, default_value=building_blocks['currency'], **bw, key='currency'),
                sg.T('Lambda', **bw),
-               sg.Combo(values=[float(f'{i:.2f}') for i in list(np.arange(0, 1.01, 0.01))], default_value=0.99, **bw, key='lambda_val')],
+               sg.Combo(values=[float(f'{i:.2f}') for i in list(np.arange(0, 1.01, 0.01))], default_value=building_blocks['lambda_val'], **bw, key='lambda_val')],
               [sg.T('_'*190)],
 
               [sg.T('', **bw), 
@@ -236,11 +83,11 @@ build_layout = [[sg.T('', **bw)],
                sg.T('Emerging', **bw),
                sg.T('Country-Specific', **bw)],          
               [sg.T('Inflation (%)', **bw), 
-               sg.Combo(values=value_range, default_value=2.2, **bw, key='us_inflation'),
-               sg.Combo(values=value_range, default_value=1.8, **bw, key='gl_inflation'),
-               sg.Combo(values=value_range, default_value=1.6, **bw, key='gl_exus_inflation'),
-               sg.Combo(values=value_range, default_value=3.0, **bw, key='em_inflation'),
-               sg.Combo(values=value_range, default_value=2.1, **bw, key='country_inflation'),],
+               sg.Combo(values=value_range, default_value=building_blocks['us_inflation'], **bw, key='us_inflation'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_inflation'], **bw, key='gl_inflation'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_inflation'], **bw, key='gl_exus_inflation'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_inflation'], **bw, key='em_inflation'),
+               sg.Combo(values=value_range, default_value=building_blocks['country_inflation'], **bw, key='country_inflation'),],
 
               [sg.T('', **bw), 
                sg.T('US', **bw),
@@ -249,10 +96,10 @@ build_layout = [[sg.T('', **bw)],
                sg.T('Emerging', **bw),
                sg.T('', **bw),],          
               [sg.T('Real Cash Rate (%)', **bw), 
-               sg.Combo(values=value_range, default_value=0.5, **bw, key='us_rcr'),
-               sg.Combo(values=value_range, default_value=0.5, **bw, key='gl_rcr'),
-               sg.Combo(values=value_range, default_value=0.5, **bw, key='gl_exus_rcr'),
-               sg.Combo(values=value_range, default_value=2.0, **bw, key='em_rcr'),
+               sg.Combo(values=value_range, default_value=building_blocks['us_rcr'], **bw, key='us_rcr'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_rcr'], **bw, key='gl_rcr'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_rcr'], **bw, key='gl_exus_rcr'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_rcr'], **bw, key='em_rcr'),
                sg.T('', **bw),],
                 
               [sg.T('', **bw), 
@@ -261,9 +108,9 @@ build_layout = [[sg.T('', **bw)],
                sg.T('Emerging', **bw),
                sg.T('', **bw),],          
               [sg.T('Real Earnings Growth (%)', **bw), 
-               sg.Combo(values=value_range, default_value=2.0, **bw, key='us_reg'),
-               sg.Combo(values=value_range, default_value=1.5, **bw, key='gl_exus_reg'),
-               sg.Combo(values=value_range, default_value=3.8, **bw, key='em_reg'),
+               sg.Combo(values=value_range, default_value=building_blocks['us_reg'], **bw, key='us_reg'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_reg'], **bw, key='gl_exus_reg'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_reg'], **bw, key='em_reg'),
                sg.T('', **bw),],
 
               [sg.T('', **bw), 
@@ -274,12 +121,12 @@ build_layout = [[sg.T('', **bw)],
                sg.T('APAC Ex Japan', **bw),
                sg.T('Emerging', **bw)],         
               [sg.T('Real GDP Growth (%)', **bw), 
-               sg.Combo(values=value_range, default_value=2.0, **bw, key='us_real_gdp'),
-               sg.Combo(values=value_range, default_value=1.5, **bw, key='europe_ex_uk_real_gdp'),
-               sg.Combo(values=value_range, default_value=1.7, **bw, key='uk_real_gdp'),
-               sg.Combo(values=value_range, default_value=0.8, **bw, key='japan_real_gdp'),
-               sg.Combo(values=value_range, default_value=2.6, **bw, key='apac_ex_japan_real_gdp'),
-               sg.Combo(values=value_range, default_value=3.8, **bw, key='em_real_gdp')],
+               sg.Combo(values=value_range, default_value=building_blocks['us_real_gdp'], **bw, key='us_real_gdp'),
+               sg.Combo(values=value_range, default_value=building_blocks['europe_ex_uk_real_gdp'], **bw, key='europe_ex_uk_real_gdp'),
+               sg.Combo(values=value_range, default_value=building_blocks['uk_real_gdp'], **bw, key='uk_real_gdp'),
+               sg.Combo(values=value_range, default_value=building_blocks['japan_real_gdp'], **bw, key='japan_real_gdp'),
+               sg.Combo(values=value_range, default_value=building_blocks['apac_ex_japan_real_gdp'], **bw, key='apac_ex_japan_real_gdp'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_real_gdp'], **bw, key='em_real_gdp')],
                [sg.T('_'*190)],
 
                [sg.T('', **bw), 
@@ -291,13 +138,13 @@ build_layout = [[sg.T('', **bw)],
                sg.T('APAC Ex Japan', **bw),
                sg.T('Emerging', **bw)],         
               [sg.T('Valuation Adjustment (%)', **bw), 
-               sg.Combo(values=value_range, default_value=-0.5, **bw, key='us_equity_val'),
-               sg.Combo(values=value_range, default_value=-0.30, **bw, key='gl_exus_equity_val'),
-               sg.Combo(values=value_range, default_value=-0.25, **bw, key='europe_ex_uk_equity_val'),
-               sg.Combo(values=value_range, default_value=-0.25, **bw, key='uk_equity_val'),
-               sg.Combo(values=value_range, default_value=-0.25, **bw, key='japan_equity_val'),
-               sg.Combo(values=value_range, default_value=-0.25, **bw, key='apac_ex_japan_equity_val'),
-               sg.Combo(values=value_range, default_value=0.00, **bw, key='em_equity_val')],
+               sg.Combo(values=value_range, default_value=building_blocks['us_equity_val'], **bw, key='us_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_equity_val'], **bw, key='gl_exus_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['europe_ex_uk_equity_val'], **bw, key='europe_ex_uk_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['uk_equity_val'], **bw, key='uk_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['japan_equity_val'], **bw, key='japan_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['apac_ex_japan_equity_val'], **bw, key='apac_ex_japan_equity_val'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_equity_val'], **bw, key='em_equity_val')],
 
               [sg.T('', **bw), 
                sg.T('US', **bw), 
@@ -308,13 +155,13 @@ build_layout = [[sg.T('', **bw)],
                sg.T('APAC Ex Japan', **bw),
                sg.T('Emerging', **bw)],         
               [sg.T('Equity Income (%)', **bw), 
-               sg.Combo(values=value_range, default_value=1.9, **bw, key='us_equity_income'),
-               sg.Combo(values=value_range, default_value=2.8, **bw, key='gl_exus_equity_income'),
-               sg.Combo(values=value_range, default_value=3.1, **bw, key='europe_ex_uk_equity_income'),
-               sg.Combo(values=value_range, default_value=3.5, **bw, key='uk_equity_income'),
-               sg.Combo(values=value_range, default_value=1.7, **bw, key='japan_equity_income'),
-               sg.Combo(values=value_range, default_value=3.8, **bw, key='apac_ex_japan_equity_income'),
-               sg.Combo(values=value_range, default_value=2.5, **bw, key='em_equity_income')],
+               sg.Combo(values=value_range, default_value=building_blocks['us_equity_income'], **bw, key='us_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_equity_income'], **bw, key='gl_exus_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['europe_ex_uk_equity_income'], **bw, key='europe_ex_uk_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['uk_equity_income'], **bw, key='uk_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['japan_equity_income'], **bw, key='japan_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['apac_ex_japan_equity_income'], **bw, key='apac_ex_japan_equity_income'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_equity_income'], **bw, key='em_equity_income')],
                 
               [sg.T('', **bw), 
                sg.T('US', **bw),
@@ -325,13 +172,13 @@ build_layout = [[sg.T('', **bw)],
                sg.T('APAC Ex Japan', **bw),
                sg.T('Emerging', **bw)],         
               [sg.T('Equity Buybacks (%)', **bw), 
-               sg.Combo(values=value_range, default_value=0.7, **bw, key='us_equity_buyback'),
-               sg.Combo(values=value_range, default_value=0.0, **bw, key='gl_exus_equity_buyback'),
-               sg.Combo(values=value_range, default_value=0.0, **bw, key='europe_ex_uk_equity_buyback'),
-               sg.Combo(values=value_range, default_value=-0.0, **bw, key='uk_equity_buyback'),
-               sg.Combo(values=value_range, default_value=-0.0, **bw, key='japan_equity_buyback'),
-               sg.Combo(values=value_range, default_value=-0.0, **bw, key='apac_ex_japan_equity_buyback'),
-               sg.Combo(values=value_range, default_value=-0.0, **bw, key='em_equity_buyback')],
+               sg.Combo(values=value_range, default_value=building_blocks['us_equity_buyback'], **bw, key='us_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_equity_buyback'], **bw, key='gl_exus_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['europe_ex_uk_equity_buyback'], **bw, key='europe_ex_uk_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['uk_equity_buyback'], **bw, key='uk_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['japan_equity_buyback'], **bw, key='japan_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['apac_ex_japan_equity_buyback'], **bw, key='apac_ex_japan_equity_buyback'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_equity_buyback'], **bw, key='em_equity_buyback')],
                [sg.T('_'*190)],
 
               [sg.T('', **bw), 
@@ -340,10 +187,10 @@ build_layout = [[sg.T('', **bw)],
                sg.T('10 Yr', **bw),
                sg.T('30 Yr', **bw)],       
               [sg.T('Term Premiums (%)', **bw), 
-               sg.Combo(values=value_range, default_value=0.00, **bw, key='term_prem_3mo'),
-               sg.Combo(values=value_range, default_value=0.75, **bw, key='term_prem_5yr'),
-               sg.Combo(values=value_range, default_value=1.0, **bw, key='term_prem_10yr'),
-               sg.Combo(values=value_range, default_value=1.25, **bw, key='term_prem_30yr')],
+               sg.Combo(values=value_range, default_value=building_blocks['term_prem_3mo'], **bw, key='term_prem_3mo'),
+               sg.Combo(values=value_range, default_value=building_blocks['term_prem_5yr'], **bw, key='term_prem_5yr'),
+               sg.Combo(values=value_range, default_value=building_blocks['term_prem_10yr'], **bw, key='term_prem_10yr'),
+               sg.Combo(values=value_range, default_value=building_blocks['term_prem_30yr'], **bw, key='term_prem_30yr')],
 
               [sg.T('', **bw), 
                sg.T('US', **bw), 
@@ -351,24 +198,24 @@ build_layout = [[sg.T('', **bw)],
                sg.T('Global ex-US', **bw), 
                sg.T('Emerging', **bw)],       
               [sg.T('Term Premium Adjust (%)', **bw), 
-               sg.Combo(values=value_range, default_value=0, **bw, key='us_theme_tp_adjust'),
-               sg.Combo(values=value_range, default_value=0, **bw, key='gl_theme_tp_adjust'),
-               sg.Combo(values=value_range, default_value=0.25, **bw, key='gl_exus_theme_tp_adjust'),
-               sg.Combo(values=value_range, default_value=0, **bw, key='em_theme_tp_adjust')],
+               sg.Combo(values=value_range, default_value=building_blocks['us_theme_tp_adjust'], **bw, key='us_theme_tp_adjust'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_theme_tp_adjust'], **bw, key='gl_theme_tp_adjust'),
+               sg.Combo(values=value_range, default_value=building_blocks['gl_exus_theme_tp_adjust'], **bw, key='gl_exus_theme_tp_adjust'),
+               sg.Combo(values=value_range, default_value=building_blocks['em_theme_tp_adjust'], **bw, key='em_theme_tp_adjust')],
 
               [sg.T('', **bw), 
                sg.T('US', **bw), 
                sg.T('Global', **bw), 
                sg.T('Emerging', **bw)],       
               [sg.T('Yrs to Normal Yields', **bw), 
-               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=3, **bw, key='yield_norm_yrs'),
-               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=5, **bw, key='gl_yield_norm_yrs'),
-               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=5, **bw, key='em_yield_norm_yrs')],
+               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=building_blocks['yield_norm_yrs'], **bw, key='yield_norm_yrs'),
+               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=building_blocks['gl_yield_norm_yrs'], **bw, key='gl_yield_norm_yrs'),
+               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=building_blocks['em_yield_norm_yrs'], **bw, key='em_yield_norm_yrs')],
 
               [sg.T('', **bw), 
                sg.T('Global', **bw)],      
               [sg.T('Yrs to Normal Spreads', **bw), 
-               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=5, **bw, key='spread_norm_yrs')],
+               sg.Combo(values=[0,1,2,3,4,5,6,7,8,9,10], default_value=building_blocks['spread_norm_yrs'], **bw, key='spread_norm_yrs')],
               [sg.T('_'*190)]]
 
 
@@ -15,12 +15,54 @@
 
 # %%
 import cma_gui as cma
-import pandas as pd
+import data_store
+import fetch
+import providers
+import scheduler
 
-from datetime import date
-from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from xbbg import blp
+
+# %% [markdown]
+# # Functions
+
+# %%
+def combine_fixed_us(fixed_fields, bank_loan_fields, tips_fields):
+    """Add bank loan and TIPS series pulled separately to the USD fixed income fields"""
+    bank_loan_yield = bank_loan_fields['PX_LAST']
+    tips_duration = tips_fields['MODIFIED_DURATION']
+
+    fixed_yields = fixed_fields['YIELD_TO_WORST']
+    fixed_spreads = fixed_fields['INDEX_OAS_TSY']
+    fixed_durations = fixed_fields['INDEX_OAD_TSY']
+
+    # Combine with other yield results
+    fixed_yields['U.S. Bank Loans'] = bank_loan_yield
+
+    # Fill for indices with no spread
+    fixed_spreads['U.S. TIPS'] = 0
+    fixed_spreads['U.S. Intermediate Municipal'] = 0
+    fixed_spreads['U.S. Short Municipal'] = 0
+
+    # Add bank loan spread estimate
+    fixed_spreads['U.S. Bank Loans'] = fixed_yields['U.S. Bank Loans'] - fixed_yields['U.S. Treasury Bills']
+
+    # Add constant for bank loan spreads
+    fixed_durations['U.S. Bank Loans'] = 0.25
+    fixed_durations['U.S. TIPS'] = tips_duration
+
+    # Keep the order of the fixed income names when the pull left out the columns filled in above
+    for fld, df in fixed_fields.items():
+        fixed_fields[fld] = df[[x for x in fixed_name_list if x in df.columns]
+                               + [x for x in df.columns if x not in fixed_name_list]]
+
+    return fixed_fields
+
+
+def join_beta_returns(fixed_fields_nonus, beta_fields):
+    """Add beta return needed to fixed non-us data"""
+    fixed_returns_nonus = fixed_fields_nonus[data_return_nonus[0]].reindex(columns=fixed_name_list_nonus)
+    return fixed_returns_nonus.join(beta_fields[data_return_nonus[0]])
+
 
 # %% [markdown]
 # # As of Date
@@ -33,6 +75,33 @@ end_date_str = end_date.strftime('%m-%d-%Y')
 start_date = end_date - relativedelta(years=30)
 start_date_str = start_date.strftime('%m-%d-%Y')
 
+# %% [markdown]
+# # Stored History
+
+# %%
+# Only request months missing from the stored series, set to False to re-pull the full window
+incremental = True
+
+stored_series = data_store.load_series()
+if not incremental:
+    stored_series = stored_series.iloc[:0]
+
+# %% [markdown]
+# # Fetch Schedule
+
+# %%
+# Maximum number of Bloomberg requests in flight at once
+max_requests = 4
+
+# Source of the data, 'replay' serves the series already in the store so the model can run without a terminal
+provider = providers.get_provider()
+
+# Datasets are declared as name: (tickers, fields, dictionary)
+datasets = {}
+
+# Datasets built from other datasets are declared as name: (function, dependencies)
+derived_tasks = {}
+
 # %% [markdown]
 # # Equity Data
 
@@ -43,23 +112,14 @@ start_date_str = start_date.strftime('%m-%d-%Y')
 # Bloomberg code to pull gross of dividend return values
 data_return = ['DAY_TO_DAY_TOT_RETURN_GROSS_DVDS']
 
-# %% [raw]
-# equity_name_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'equity_us_name' in k}.values())))
-# equity_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'equity_us_code' in k}.values())))
-# equity_dictionary = dict(zip(equity_list, equity_name_list))
-
 # %%
-equity_returns = blp.bdh(tickers=equity_list, flds=data_return, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-equity_returns.columns = equity_returns.columns.droplevel(1)
-equity_returns.columns = equity_returns.columns.map(equity_dictionary)
-
-# Convert index to datetime
-equity_returns.index = pd.to_datetime(equity_returns.index)
+# Reference for future renaming of columns
+equity_name_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'equity_us_name' in k}.values())))
+equity_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'equity_us_code' in k}.values())))
+equity_dictionary = dict(zip(equity_list, equity_name_list))
 
-# Adjust dataframe for varying month end dates
-equity_returns = equity_returns.resample('M', axis=0).mean()
+# %%
+datasets['equity'] = (equity_list, data_return, equity_dictionary)
 
 # %% [markdown]
 # ## Non-USD
@@ -75,18 +135,7 @@ equity_name_list_nonus = list(filter(None, list({k:v for (k,v) in cma.val_dict.i
 equity_dictionary_nonus = dict(zip(equity_list_nonus, equity_name_list_nonus))
 
 # %%
-equity_returns_nonus = blp.bdh(tickers=equity_list_nonus, flds=data_return_nonus, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-equity_returns_nonus.columns = equity_returns_nonus.columns.droplevel(1)
-equity_returns_nonus.columns = equity_returns_nonus.columns.map(equity_dictionary_nonus)
-
-# Convert index to datetime
-equity_returns_nonus.index = pd.to_datetime(equity_returns_nonus.index)
-
-# Adjust dataframe for varying month end dates
-equity_returns_nonus = equity_returns_nonus.resample('M', axis=0).mean()
-equity_returns_nonus = equity_returns_nonus.reindex(columns=equity_name_list_nonus)
+datasets['equity_nonus'] = (equity_list_nonus, data_return_nonus, equity_dictionary_nonus)
 
 # %% [markdown]
 # # Fixed Income Data
@@ -101,95 +150,21 @@ fixed_name_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items()
 fixed_dictionary = dict(zip(fixed_list, fixed_name_list))
 
 # %% [markdown]
-# ### USD Fixed Returns
-
-# %%
-fixed_returns = blp.bdh(tickers=fixed_list, flds=data_return, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_returns.columns = fixed_returns.columns.droplevel(1)
-fixed_returns.columns = fixed_returns.columns.map(fixed_dictionary)
-
-# Convert index to datetime
-fixed_returns.index= pd.to_datetime(fixed_returns.index)
-
-# Adjust dataframe for varying month end dates
-fixed_returns = fixed_returns.resample('M', axis=0).mean()
-
-# %% [markdown]
-# ### USD Fixed Yields
-
-# %%
-fixed_yields = blp.bdh(tickers=fixed_list, flds='YIELD_TO_WORST', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_yields.columns = fixed_yields.columns.droplevel(1)
-fixed_yields.columns = fixed_yields.columns.map(fixed_dictionary)
-
-# Convert index to datetime
-fixed_yields.index = pd.to_datetime(fixed_yields.index)
-
-# Adjust dataframe for varying month end dates
-fixed_yields = fixed_yields.resample('M', axis=0).mean()
+# ### USD Fixed Returns, Yields, Spreads and Durations
 
 # %%
-# Add bank loan yields
-bank_loan_yield = blp.bdh(tickers='SPBDLLY Index', flds='PX_LAST', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-bank_loan_yield.columns = bank_loan_yield.columns.droplevel(1)
-
-# Adjust dataframes for varying month end dates
-bank_loan_yield = bank_loan_yield.resample('M', axis=0).mean()
+# Pull all fixed income fields in a single request
+datasets['fixed'] = (fixed_list, data_return + ['YIELD_TO_WORST', 'INDEX_OAS_TSY', 'INDEX_OAD_TSY'], fixed_dictionary)
 
 # %%
-# Combine with other yield results
-fixed_yields['U.S. Bank Loans'] = bank_loan_yield
-
-# %% [markdown]
-# ### USD Fixed Spreads
-
-# %%
-fixed_spreads = blp.bdh(tickers=fixed_list, flds='INDEX_OAS_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_spreads.columns = fixed_spreads.columns.droplevel(1)
-fixed_spreads.columns = fixed_spreads.columns.map(fixed_dictionary)
-
-# Fill for indices with no spread
-fixed_spreads['U.S. TIPS'] = 0
-fixed_spreads['U.S. Intermediate Municipal'] = 0
-fixed_spreads['U.S. Short Municipal'] = 0
+# Bank loan yields and TIPS duration
+datasets['bank_loan_yield'] = ('SPBDLLY Index', ['PX_LAST'], {'SPBDLLY Index': 'U.S. Bank Loans'})
 
-# Convert index to datetime
-fixed_spreads.index = pd.to_datetime(fixed_spreads.index)
-
-# Adjust dataframe for varying month end dates
-fixed_spreads = fixed_spreads.resample('M', axis=0).mean()
-
-# Add bank loan spread estimate
-fixed_spreads['U.S. Bank Loans'] = fixed_yields['U.S. Bank Loans'] - fixed_yields['U.S. Treasury Bills']
-
-# %% [markdown]
-# ### USD Fixed Duration
+datasets['tips_duration'] = ('BCIT1T Index', ['MODIFIED_DURATION'], {'BCIT1T Index': 'U.S. TIPS'})
 
 # %%
-fixed_durations = blp.bdh(tickers=fixed_list, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-tips_duration = blp.bdh(tickers='BCIT1T Index', flds='MODIFIED_DURATION', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_durations.columns = fixed_durations.columns.droplevel(1)
-fixed_durations.columns = fixed_durations.columns.map(fixed_dictionary)
-
-# Add constant for bank loan spreads
-fixed_durations['U.S. Bank Loans'] = 0.25
-fixed_durations['U.S. TIPS'] = tips_duration
-
-# Convert index to datetime
-fixed_durations.index = pd.to_datetime(fixed_durations.index)
-
-# Adjust dataframe for varying month end dates
-fixed_durations = fixed_durations.resample('M', axis=0).mean()
+# Bank loan spread uses the bank loan and treasury bill yields
+derived_tasks['fixed_combined'] = (combine_fixed_us, ['fixed', 'bank_loan_yield', 'tips_duration'])
 
 # %% [markdown]
 # ## Non USD - Fixed
@@ -201,69 +176,12 @@ fixed_name_list_nonus = list(filter(None, list({k:v for (k,v) in cma.val_dict.it
 fixed_dictionary_nonus = dict(zip(fixed_list_nonus, fixed_name_list_nonus))
 
 # %% [markdown]
-# ### Non-USD Fixed Returns
-
-# %%
-fixed_returns_nonus = blp.bdh(tickers=fixed_list_nonus, flds=data_return_nonus, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_returns_nonus.columns = fixed_returns_nonus.columns.droplevel(1)
-fixed_returns_nonus.columns = fixed_returns_nonus.columns.map(fixed_dictionary_nonus)
-
-# Convert index to datetime
-fixed_returns_nonus.index= pd.to_datetime(fixed_returns_nonus.index)
-
-# Adjust dataframe for varying month end dates
-fixed_returns_nonus = fixed_returns_nonus.resample('M', axis=0).mean()
-fixed_returns_nonus = fixed_returns_nonus.reindex(columns=fixed_name_list_nonus)
-
-# %% [markdown]
-# ### Non-USD Fixed Yields
+# ### Non-USD Fixed Returns, Yields, Spreads and Durations
 
 # %%
-fixed_yields_nonus = blp.bdh(tickers=fixed_list_nonus, flds='YIELD_TO_WORST', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_yields_nonus.columns = fixed_yields_nonus.columns.droplevel(1)
-fixed_yields_nonus.columns = fixed_yields_nonus.columns.map(fixed_dictionary_nonus)
-
-# Convert index to datetime
-fixed_yields_nonus.index = pd.to_datetime(fixed_yields_nonus.index)
-
-# Adjust dataframe for varying month end dates
-fixed_yields_nonus = fixed_yields_nonus.resample('M', axis=0).mean()
-
-# %% [markdown]
-# ### Non-USD Fixed Spreads
-
-# %%
-fixed_spreads_nonus = blp.bdh(tickers=fixed_list_nonus, flds='INDEX_OAS_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_spreads_nonus.columns = fixed_spreads_nonus.columns.droplevel(1)
-fixed_spreads_nonus.columns = fixed_spreads_nonus.columns.map(fixed_dictionary_nonus)
-
-# Convert index to datetime
-fixed_spreads_nonus.index = pd.to_datetime(fixed_spreads_nonus.index)
-
-# Adjust dataframe for varying month end dates
-fixed_spreads_nonus = fixed_spreads_nonus.resample('M', axis=0).mean()
-
-# %% [markdown]
-# ### Non-USD Fixed Duration
-
-# %%
-fixed_durations_nonus = blp.bdh(tickers=fixed_list_nonus, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_durations_nonus.columns = fixed_durations_nonus.columns.droplevel(1)
-fixed_durations_nonus.columns = fixed_durations_nonus.columns.map(fixed_dictionary_nonus)
-
-# Convert index to datetime
-fixed_durations_nonus.index = pd.to_datetime(fixed_durations_nonus.index)
-
-# Adjust dataframe for varying month end dates
-fixed_durations_nonus = fixed_durations_nonus.resample('M', axis=0).mean()
+# Pull all fixed income fields in a single request
+datasets['fixed_nonus'] = (fixed_list_nonus, data_return_nonus + ['YIELD_TO_WORST', 'INDEX_OAS_TSY', 'INDEX_OAD_TSY'],
+                          fixed_dictionary_nonus)
 
 # %% [markdown]
 # # Treasury Data
@@ -276,26 +194,8 @@ treasury_list = ['I00087 Index', 'BTB5STAT Index', 'BW10STAT Index', 'BW30STAT I
 treasury_dictionary = {'I00087 Index': '3 Mo', 'BTB5STAT Index': '5 Yr', 'BW10STAT Index': '10 Yr', 'BW30STAT Index': '30 Yr'}
 
 # %%
-# Treasury Yields
-fixed_treasury_yld = blp.bdh(tickers=treasury_list, flds='INDEX_YIELD_TO_MATURITY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_treasury_yld.columns = fixed_treasury_yld.columns.droplevel(1)
-fixed_treasury_yld.columns = fixed_treasury_yld.columns.map(treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-fixed_treasury_yld = fixed_treasury_yld.resample('M', axis=0).mean()
-
-# %%
-# Treasury Duration
-fixed_treasury_dur = blp.bdh(tickers=treasury_list, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-fixed_treasury_dur.columns = fixed_treasury_dur.columns.droplevel(1)
-fixed_treasury_dur.columns = fixed_treasury_dur.columns.map(treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-fixed_treasury_dur = fixed_treasury_dur.resample('M', axis=0).mean()
+# Treasury Yields and Durations
+datasets['treasury'] = (treasury_list, ['INDEX_YIELD_TO_MATURITY', 'INDEX_OAD_TSY'], treasury_dictionary)
 
 # %% [markdown]
 # ## Global Treasury Data
@@ -306,26 +206,8 @@ gl_treasury_dictionary = {'LGY3TRUU Index': '1-3 Yr', 'I04790 Index': '3-5 Yr',
                           'LGY7TRUU Index': '7-10 Yr','LGY1TRUU Index': '10+ Yr'}  
 
 # %%
-# Gl Treasury Yields
-gl_fixed_treasury_yld = blp.bdh(tickers=gl_treasury_list, flds='INDEX_YIELD_TO_MATURITY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-gl_fixed_treasury_yld.columns = gl_fixed_treasury_yld.columns.droplevel(1)
-gl_fixed_treasury_yld.columns = gl_fixed_treasury_yld.columns.map(gl_treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-gl_fixed_treasury_yld = gl_fixed_treasury_yld.resample('M', axis=0).mean()
-
-# %%
-# Gl Treasury Durations
-gl_fixed_treasury_dur = blp.bdh(tickers=gl_treasury_list, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-gl_fixed_treasury_dur.columns = gl_fixed_treasury_dur.columns.droplevel(1)
-gl_fixed_treasury_dur.columns = gl_fixed_treasury_dur.columns.map(gl_treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-gl_fixed_treasury_dur = gl_fixed_treasury_dur.resample('M', axis=0).mean()
+# Gl Treasury Yields and Durations
+datasets['gl_treasury'] = (gl_treasury_list, ['INDEX_YIELD_TO_MATURITY', 'INDEX_OAD_TSY'], gl_treasury_dictionary)
 
 # %% [markdown]
 # ## Global Agg Data
@@ -336,37 +218,8 @@ gl_agg_dictionary = {'H16607US Index': '1-3 Yr', 'H16608US Index': '3-5 Yr', 'H1
                           'H16610US Index': '7-10 Yr','H16611US Index': '10+ Yr'}     
 
 # %%
-# Gl Treasury Yields
-gl_fixed_agg_yld = blp.bdh(tickers=gl_agg_list, flds='INDEX_YIELD_TO_MATURITY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-gl_fixed_agg_yld.columns = gl_fixed_agg_yld.columns.droplevel(1)
-gl_fixed_agg_yld.columns = gl_fixed_agg_yld.columns.map(gl_agg_dictionary)
-
-# Adjust dataframe for varying month end dates
-gl_fixed_agg_yld = gl_fixed_agg_yld.resample('M', axis=0).mean()
-
-# %%
-# Gl Treasury Durations
-gl_fixed_agg_dur = blp.bdh(tickers=gl_agg_list, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-gl_fixed_agg_dur.columns = gl_fixed_agg_dur.columns.droplevel(1)
-gl_fixed_agg_dur.columns = gl_fixed_agg_dur.columns.map(gl_agg_dictionary)
-
-# Adjust dataframe for varying month end dates
-gl_fixed_agg_dur = gl_fixed_agg_dur.resample('M', axis=0).mean()
-
-# %%
-# Gl Treasury Spreads
-gl_fixed_agg_spread = blp.bdh(tickers=gl_agg_list, flds='INDEX_OAS_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-gl_fixed_agg_spread.columns = gl_fixed_agg_spread.columns.droplevel(1)
-gl_fixed_agg_spread.columns = gl_fixed_agg_spread.columns.map(gl_agg_dictionary)
-
-# Adjust dataframe for varying month end dates
-gl_fixed_agg_spread = gl_fixed_agg_spread.resample('M', axis=0).mean()
+# Gl Agg Yields, Durations and Spreads
+datasets['gl_agg'] = (gl_agg_list, ['INDEX_YIELD_TO_MATURITY', 'INDEX_OAD_TSY', 'INDEX_OAS_TSY'], gl_agg_dictionary)
 
 # %% [markdown]
 # ## EM Treasury Data
@@ -376,26 +229,8 @@ em_treasury_list = ['I22843US Index', 'I22844US Index', 'I22845US Index', 'I2284
 em_treasury_dictionary = {'I22843US Index': '1-3 Yr', 'I22844US Index': '3-5 Yr', 'I22845US Index': '5-7 Yr', 'I22846US Index': '7-10 Yr','I22847US Index': '10+ Yr'}    
 
 # %%
-# Treasury Yields
-em_fixed_treasury_yld = blp.bdh(tickers=em_treasury_list, flds='INDEX_YIELD_TO_MATURITY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-em_fixed_treasury_yld.columns = em_fixed_treasury_yld.columns.droplevel(1)
-em_fixed_treasury_yld.columns = em_fixed_treasury_yld.columns.map(em_treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-em_fixed_treasury_yld = em_fixed_treasury_yld.resample('M', axis=0).mean()
-
-# %%
-# Treasury Duration
-em_fixed_treasury_dur = blp.bdh(tickers=em_treasury_list, flds='INDEX_OAD_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-em_fixed_treasury_dur.columns = em_fixed_treasury_dur.columns.droplevel(1)
-em_fixed_treasury_dur.columns = em_fixed_treasury_dur.columns.map(em_treasury_dictionary)
-
-# Adjust dataframe for varying month end dates
-em_fixed_treasury_dur = em_fixed_treasury_dur.resample('M', axis=0).mean()
+# Treasury Yields and Durations
+datasets['em_treasury'] = (em_treasury_list, ['INDEX_YIELD_TO_MATURITY', 'INDEX_OAD_TSY'], em_treasury_dictionary)
 
 # %% [markdown]
 # ## AA Corp Data (for Muni Calcs)
@@ -406,11 +241,7 @@ aa_corp_dictionary = {'I08219 Index': 'AA Corp'}
 
 # %%
 # AA Corp Spreads
-aa_corp_spread = blp.bdh(tickers=aa_corp_list, flds='INDEX_OAS_TSY', start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-aa_corp_spread.columns = aa_corp_spread.columns.droplevel(1)
-aa_corp_spread.columns = aa_corp_spread.columns.map(aa_corp_dictionary)
+datasets['aa_corp'] = (aa_corp_list, ['INDEX_OAS_TSY'], aa_corp_dictionary)
 
 # %% [markdown]
 # # Alts Data
@@ -425,17 +256,7 @@ alts_name_list = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() i
 alts_dictionary = dict(zip(alts_list, alts_name_list))
 
 # %%
-alts_returns = blp.bdh(tickers=alts_list, flds=data_return, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-alts_returns.columns = alts_returns.columns.droplevel(1)
-alts_returns.columns = alts_returns.columns.map(alts_dictionary)
-
-# Convert index to datetime
-alts_returns.index = pd.to_datetime(alts_returns.index)
-
-# Adjust dataframe for varying month end dates
-alts_returns = alts_returns.resample('M', axis=0).mean()
+datasets['alts'] = (alts_list, data_return, alts_dictionary)
 
 # %% [markdown]
 # ## Non USD - Alts
@@ -447,17 +268,7 @@ alts_name_list_nonus = list(filter(None, list({k:v for (k,v) in cma.val_dict.ite
 alts_dictionary_nonus = dict(zip(alts_list_nonus, alts_name_list_nonus))
 
 # %%
-alts_returns_nonus = blp.bdh(tickers=alts_list_nonus, flds=data_return_nonus, start_date=start_date_str, end_date=end_date_str, Per='M')
-
-# Rename and reorder columns
-alts_returns_nonus.columns = alts_returns_nonus.columns.droplevel(1)
-alts_returns_nonus.columns = alts_returns_nonus.columns.map(alts_dictionary_nonus)
-
-# Convert index to datetime
-alts_returns_nonus.index = pd.to_datetime(alts_returns_nonus.index)
-
-# Adjust dataframe for varying month end dates
-alts_returns_nonus = alts_returns_nonus.resample('M', axis=0).mean()
+datasets['alts_nonus'] = (alts_list_nonus, data_return_nonus, alts_dictionary_nonus)
 
 # %% [markdown]
 # # Currency
@@ -475,74 +286,164 @@ for key in cross_currencies:
         break 
 
 # %%
-historical_cross_currencies = blp.bdh(tickers=cross_currencies, flds='PX_LAST', start_date=start_date_str, end_date=end_date_str, Per='M')
+datasets['currencies'] = (cross_currencies, ['PX_LAST'], cross_currencies_dictionary)
 
-# Rename and reorder columns
-historical_cross_currencies.columns = historical_cross_currencies.columns.droplevel(1)
-historical_cross_currencies.columns = historical_cross_currencies.columns.map(cross_currencies_dictionary)
+# %% [markdown]
+# # Beta Index Data
 
-# Convert index to datetime
-historical_cross_currencies.index = pd.to_datetime(historical_cross_currencies.index)
+# %%
+beta_list = 'EMUSTRUU Index'
+beta_dictionary = {'EMUSTRUU Index': 'Emerging Debt Agg USD'}
 
-# Adjust dataframe for varying month end dates
-historical_cross_currencies = historical_cross_currencies.resample('M', axis=0).mean()
+# %%
+datasets['beta'] = (beta_list, data_return_nonus, beta_dictionary)
+
+# %%
+# Add beta return needed to fixed non-us data
+derived_tasks['fixed_returns_nonus'] = (join_beta_returns, ['fixed_nonus', 'beta'])
+
+# %% [markdown]
+# # Seed Store
+
+# %%
+# Workbook dataset holding each field of each dataset, as name: {field: (workbook, sheet)}
+workbook_sources = {
+    'equity': {data_return[0]: ('bloomberg_data_us', 'equity_returns')},
+    'equity_nonus': {data_return_nonus[0]: ('bloomberg_data_nonus', 'equity_returns')},
+    'fixed': {data_return[0]: ('bloomberg_data_us', 'fixed_returns'),
+              'YIELD_TO_WORST': ('bloomberg_data_us', 'fixed_yields'),
+              'INDEX_OAS_TSY': ('bloomberg_data_us', 'fixed_spreads'),
+              'INDEX_OAD_TSY': ('bloomberg_data_us', 'fixed_durations')},
+    'bank_loan_yield': {'PX_LAST': ('bloomberg_data_us', 'fixed_yields')},
+    'tips_duration': {'MODIFIED_DURATION': ('bloomberg_data_us', 'fixed_durations')},
+    'fixed_nonus': {data_return_nonus[0]: ('bloomberg_data_nonus', 'fixed_returns'),
+                    'YIELD_TO_WORST': ('bloomberg_data_nonus', 'fixed_yields'),
+                    'INDEX_OAS_TSY': ('bloomberg_data_nonus', 'fixed_spreads'),
+                    'INDEX_OAD_TSY': ('bloomberg_data_nonus', 'fixed_durations')},
+    'beta': {data_return_nonus[0]: ('bloomberg_data_nonus', 'fixed_returns')},
+    'treasury': {'INDEX_YIELD_TO_MATURITY': ('term_structure_data', 'us_treas_yld'),
+                 'INDEX_OAD_TSY': ('term_structure_data', 'us_treas_dur')},
+    'gl_treasury': {'INDEX_YIELD_TO_MATURITY': ('term_structure_data', 'gl_treas_yld'),
+                    'INDEX_OAD_TSY': ('term_structure_data', 'gl_treas_dur')},
+    'gl_agg': {'INDEX_YIELD_TO_MATURITY': ('term_structure_data', 'gl_agg_yld'),
+               'INDEX_OAD_TSY': ('term_structure_data', 'gl_agg_dur'),
+               'INDEX_OAS_TSY': ('term_structure_data', 'gl_agg_spreads')},
+    'em_treasury': {'INDEX_YIELD_TO_MATURITY': ('term_structure_data', 'em_treas_yld'),
+                    'INDEX_OAD_TSY': ('term_structure_data', 'em_treas_dur')},
+    'aa_corp': {'INDEX_OAS_TSY': ('term_structure_data', 'aa_corp_spread')},
+    'alts': {data_return[0]: ('bloomberg_data_us', 'alts_returns')},
+    'alts_nonus': {data_return_nonus[0]: ('bloomberg_data_nonus', 'alts_returns')},
+    'currencies': {'PX_LAST': ('bloomberg_data_nonus', 'currencies')},
+    }
+
+# Columns combine_fixed_us fills in from other series or constants, as name: {field: [columns]}. They are left out of
+# the seed, since they were never pulled for the fixed tickers
+workbook_derived = {
+    'fixed': {'YIELD_TO_WORST': ['U.S. Bank Loans'],
+              'INDEX_OAS_TSY': ['U.S. TIPS', 'U.S. Intermediate Municipal', 'U.S. Short Municipal', 'U.S. Bank Loans'],
+              'INDEX_OAD_TSY': ['U.S. Bank Loans', 'U.S. TIPS']},
+    }
+
+# %%
+# Seed an empty series store from the existing workbooks, so incremental pulls and the replay provider start from them
+if data_store.load_series().empty:
+    seeded_series = fetch.workbook_series(datasets, workbook_sources, workbook_derived)
+    data_store.save_series(seeded_series)
+    if incremental:
+        stored_series = seeded_series
+
+# %% [markdown]
+# # Fetch Data
+
+# %%
+# Each unique ticker and field is requested once across all datasets, from the last month stored for it
+fetch_tasks = fetch.fetch_tasks(datasets, stored_series, start_date, end_date, provider)
+fetch_tasks.update(derived_tasks)
+
+fetched = scheduler.run_tasks(fetch_tasks, max_workers=max_requests)
+
+# %%
+# Equity
+equity_returns = fetched['equity'][data_return[0]]
+equity_returns_nonus = fetched['equity_nonus'][data_return_nonus[0]].reindex(columns=equity_name_list_nonus)
+
+# USD fixed income
+fixed_returns = fetched['fixed_combined'][data_return[0]]
+fixed_yields = fetched['fixed_combined']['YIELD_TO_WORST']
+fixed_spreads = fetched['fixed_combined']['INDEX_OAS_TSY']
+fixed_durations = fetched['fixed_combined']['INDEX_OAD_TSY']
+
+# Non-USD fixed income
+fixed_returns_nonus = fetched['fixed_returns_nonus']
+fixed_yields_nonus = fetched['fixed_nonus']['YIELD_TO_WORST']
+fixed_spreads_nonus = fetched['fixed_nonus']['INDEX_OAS_TSY']
+fixed_durations_nonus = fetched['fixed_nonus']['INDEX_OAD_TSY']
+
+# Term structures
+fixed_treasury_yld = fetched['treasury']['INDEX_YIELD_TO_MATURITY']
+fixed_treasury_dur = fetched['treasury']['INDEX_OAD_TSY']
+gl_fixed_treasury_yld = fetched['gl_treasury']['INDEX_YIELD_TO_MATURITY']
+gl_fixed_treasury_dur = fetched['gl_treasury']['INDEX_OAD_TSY']
+gl_fixed_agg_yld = fetched['gl_agg']['INDEX_YIELD_TO_MATURITY']
+gl_fixed_agg_dur = fetched['gl_agg']['INDEX_OAD_TSY']
+gl_fixed_agg_spread = fetched['gl_agg']['INDEX_OAS_TSY']
+em_fixed_treasury_yld = fetched['em_treasury']['INDEX_YIELD_TO_MATURITY']
+em_fixed_treasury_dur = fetched['em_treasury']['INDEX_OAD_TSY']
+aa_corp_spread = fetched['aa_corp']['INDEX_OAS_TSY']
+
+# Alts
+alts_returns = fetched['alts'][data_return[0]]
+alts_returns_nonus = fetched['alts_nonus'][data_return_nonus[0]]
+
+# Currency
+historical_cross_currencies = fetched['currencies']['PX_LAST']
 historical_cross_currencies['USD'] = 1
 
 # %% [markdown]
-# # Beta Index Data
+# # Save Data
 
 # %%
-beta_list = 'EMUSTRUU Index'
-beta_dictionary = {'EMUSTRUU Index': 'Emerging Debt Agg USD'}
+# Also write the Excel workbooks, only needed for reviewing the data outside of the model
+excel_export = True
 
 # %%
-beta_returns = blp.bdh(tickers=beta_list, flds=data_return_nonus, start_date=start_date_str, end_date=end_date_str, Per='M')
+data_store.save_series(fetched['series'])
 
-# Rename and reorder columns
-beta_returns.columns = beta_returns.columns.droplevel(1)
-beta_returns.columns = beta_returns.columns.map(beta_dictionary)
+# %%
+data_store.save_workbook('bloomberg_data_us', {
+    'equity_returns': equity_returns,
+    'fixed_returns': fixed_returns,
+    'fixed_yields': fixed_yields,
+    'fixed_spreads': fixed_spreads,
+    'fixed_durations': fixed_durations,
+    'alts_returns': alts_returns}, excel=excel_export)
 
-# Convert index to datetime
-beta_returns.index = pd.to_datetime(beta_returns.index)
+# %%
+data_store.save_workbook('bloomberg_data_nonus', {
+    'equity_returns': equity_returns_nonus,
+    'fixed_returns': fixed_returns_nonus,
+    'fixed_yields': fixed_yields_nonus,
+    'fixed_spreads': fixed_spreads_nonus,
+    'fixed_durations': fixed_durations_nonus,
+    'alts_returns': alts_returns_nonus,
+    'currencies': historical_cross_currencies}, excel=excel_export)
 
-# Adjust dataframe for varying month end dates
-beta_returns = beta_returns.resample('M', axis=0).mean()
+# %%
+data_store.save_workbook('term_structure_data', {
+    'aa_corp_spread': aa_corp_spread,
+    'us_treas_yld': fixed_treasury_yld,
+    'us_treas_dur': fixed_treasury_dur,
+    'gl_treas_yld': gl_fixed_treasury_yld,
+    'gl_treas_dur': gl_fixed_treasury_dur,
+    'gl_agg_yld': gl_fixed_agg_yld,
+    'gl_agg_dur': gl_fixed_agg_dur,
+    'gl_agg_spreads': gl_fixed_agg_spread,
+    'em_treas_yld': em_fixed_treasury_yld,
+    'em_treas_dur': em_fixed_treasury_dur}, excel=excel_export)
 
 # %%
-# Add beta return needed to fixed non-us data
-fixed_returns_nonus = fixed_returns_nonus.join(beta_returns)
+data_store.record_pull(cma.val_dict, fetch.dataset_tickers(datasets))
 
-# %% [markdown]
-# # Save Data to Excel
-
-# %%
-with pd.ExcelWriter(r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_us.xlsx') as writer:
-    equity_returns.to_excel(writer, sheet_name='equity_returns')
-    fixed_returns.to_excel(writer, sheet_name='fixed_returns')
-    fixed_yields.to_excel(writer, sheet_name='fixed_yields')
-    fixed_spreads.to_excel(writer, sheet_name='fixed_spreads')
-    fixed_durations.to_excel(writer, sheet_name='fixed_durations')
-    alts_returns.to_excel(writer, sheet_name='alts_returns')
-
-# %%
-with pd.ExcelWriter(r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx') as writer:
-    equity_returns_nonus.to_excel(writer, sheet_name='equity_returns')
-    fixed_returns_nonus.to_excel(writer, sheet_name='fixed_returns')
-    fixed_yields_nonus.to_excel(writer, sheet_name='fixed_yields')
-    fixed_spreads_nonus.to_excel(writer, sheet_name='fixed_spreads')
-    fixed_durations_nonus.to_excel(writer, sheet_name='fixed_durations')
-    alts_returns_nonus.to_excel(writer, sheet_name='alts_returns')
-    historical_cross_currencies.to_excel(writer, sheet_name='currencies')
-
-# %%
-with pd.ExcelWriter(r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\term_structure_data.xlsx') as writer:
-    aa_corp_spread.to_excel(writer, sheet_name='aa_corp_spread')
-    fixed_treasury_yld.to_excel(writer, sheet_name='us_treas_yld')
-    fixed_treasury_dur.to_excel(writer, sheet_name='us_treas_dur')
-    gl_fixed_treasury_yld.to_excel(writer, sheet_name='gl_treas_yld')
-    gl_fixed_treasury_dur.to_excel(writer, sheet_name='gl_treas_dur') 
-    gl_fixed_agg_yld.to_excel(writer, sheet_name='gl_agg_yld')
-    gl_fixed_agg_dur.to_excel(writer, sheet_name='gl_agg_dur')
-    gl_fixed_agg_spread.to_excel(writer, sheet_name='gl_agg_spreads')
-    em_fixed_treasury_yld.to_excel(writer, sheet_name='em_treas_yld')
-    em_fixed_treasury_dur.to_excel(writer, sheet_name='em_treas_dur')
+# %%
+# Stop here rather than in the later stages if the pull did not reach the as of date
+data_store.check_as_of_date(cma.val_dict)
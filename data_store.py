@@ -0,0 +1,330 @@
+import file_cache
+import hashlib
+import json
+import os
+import pandas as pd
+import shutil
+import threading
+
+from datetime import date
+from datetime import datetime
+from functools import partial
+
+# Shared data folder, the columnar store of Bloomberg data sits in the store subfolder. Set CMA_DATA_ROOT to use another
+# folder
+data_folder = os.environ.get('CMA_DATA_ROOT', r'P:\Advisory\Research\Automation\CMAs\Data')
+store_folder = os.path.join(data_folder, 'store')
+
+# Every Bloomberg series pulled, indexed by (ticker, field, date)
+series_file = os.path.join(store_folder, 'series.parquet')
+
+# Folder of the backfilled returns written by backfill_calc, moved by backtests so each month keeps its own files
+returns_folder = data_folder
+
+# Small summary of the store written by each pull, used to decide if new data is needed without loading any data
+manifest_file = os.path.join(store_folder, 'manifest.json')
+
+# Datasets published with a lag, such as the quarterly alts returns, which can end before the as of date even after a
+# pull. The model reads every other dataset at the as of date.
+lagging_datasets = ['bloomberg_data_us/alts_returns', 'bloomberg_data_nonus/alts_returns']
+
+# Local copies of the shared files, checked against the shared folder on every read. Set CMA_LOCAL_CACHE to another
+# folder, or to an empty string to always read the shared folder directly
+local_folder = os.environ.get('CMA_LOCAL_CACHE', os.path.join(os.path.expanduser('~'), 'cma_data'))
+
+# Datasets making up each workbook
+workbooks = {
+    'bloomberg_data_us': ['equity_returns', 'fixed_returns', 'fixed_yields', 'fixed_spreads', 'fixed_durations', 'alts_returns'],
+    'bloomberg_data_nonus': ['equity_returns', 'fixed_returns', 'fixed_yields', 'fixed_spreads', 'fixed_durations', 'alts_returns',
+                             'currencies'],
+    'term_structure_data': ['aa_corp_spread', 'us_treas_yld', 'us_treas_dur', 'gl_treas_yld', 'gl_treas_dur', 'gl_agg_yld',
+                            'gl_agg_dur', 'gl_agg_spreads', 'em_treas_yld', 'em_treas_dur'],
+    }
+
+# Parsed files shared by every module in the process, keyed on path with the modification time they were read at
+_cache = {}
+
+# Files read and written by the current thread, recorded while pipeline runs a stage so its results can be cached
+access_log = threading.local()
+
+
+def workbook_file(workbook):
+    return os.path.join(data_folder, workbook + '.xlsx')
+
+
+def dataset_file(workbook, sheet):
+    return os.path.join(store_folder, workbook, sheet + '.parquet')
+
+
+def returns_file(suffix):
+    return os.path.join(returns_folder, 'combined_returns_' + suffix + '.csv')
+
+
+def output_file(name):
+    return os.path.join(data_folder, 'output', name + '.xlsx')
+
+
+def panel_file(name):
+    return os.path.join(data_folder, 'output', name + '.parquet')
+
+
+def state_file(name):
+    return os.path.join(store_folder, 'ewma', name + '.pkl')
+
+
+def local_file(file):
+    """ Local copy of a file in the shared folder, None if local copies are turned off """
+    if not local_folder:
+        return None
+    return os.path.join(local_folder, os.path.relpath(file, data_folder))
+
+
+def log_access(kind, file):
+    """ Add a file to the reads or writes of the current thread, if they are being recorded """
+    files = getattr(access_log, kind, None)
+    if files is not None:
+        files.add(file)
+
+
+def read_file(file, read, log=True):
+    """ Read a shared file through its local copy, log records it as read by the stage running """
+    if log:
+        log_access('reads', file)
+    if local_file(file) is None:
+        return read(file)
+    return read(file_cache.local_copy(file, local_file(file)))
+
+
+def write_file(file, write, log=True):
+    """ Write a shared file and its local copy, write is called with the path to write to """
+    if log:
+        log_access('writes', file)
+    file_cache.write_file(file, write, local_file(file))
+    _cache.pop(file, None)
+
+
+def remove_file(file):
+    """ Remove a shared file and its local copy, if they exist """
+    files = [file] if local_file(file) is None else [file, local_file(file), local_file(file) + '.stamp']
+    for x in files:
+        try:
+            os.remove(x)
+        except FileNotFoundError:
+            pass
+    _cache.pop(file, None)
+
+
+def remove_folder(folder):
+    """ Remove a shared folder and the local copies of its files """
+    for x in [folder] if local_file(folder) is None else [folder, local_file(folder)]:
+        shutil.rmtree(x, ignore_errors=True)
+    for file in [x for x in _cache if x.startswith(os.path.join(folder, ''))]:
+        del _cache[file]
+
+
+def cached_read(file, read):
+    """ Parse a file once per process, re-reading it only if it has been modified since """
+    log_access('reads', file)
+    mtime = os.path.getmtime(file)
+    if file not in _cache or _cache[file][0] != mtime:
+        _cache[file] = (mtime, read_file(file, read))
+    return _cache[file][1]
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def read_workbook(workbook):
+    """ Every sheet of an Excel workbook, parsed in a single pass """
+    return cached_read(workbook_file(workbook), partial(pd.read_excel, sheet_name=None, index_col=0))
+
+
+def save_workbook(workbook, sheets, excel=False):
+    """ Write each dataset of a workbook to the columnar store, and to the Excel workbook if requested """
+    for sheet, df in sheets.items():
+        write_file(dataset_file(workbook, sheet), df.to_parquet)
+
+    # Record the last date of each dataset
+    manifest = load_manifest()
+    manifest.setdefault('last_dates', {}).update(
+        {workbook + '/' + sheet: df.index.max().strftime('%Y-%m-%d') for (sheet, df) in sheets.items() if len(df.index)})
+    save_manifest(manifest)
+
+    if excel:
+        write_file(workbook_file(workbook), partial(write_excel, sheets))
+
+
+def write_excel(sheets, file):
+    with pd.ExcelWriter(file) as writer:
+        for sheet, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet)
+
+
+def load_dataset(workbook, sheet):
+    """ Read a dataset from the columnar store, falling back to the Excel workbook if it has not been stored yet
+
+    Returns a copy so callers can modify it without affecting the cached data.
+    """
+    # Logged even if it does not exist yet, since creating it changes what is read
+    file = dataset_file(workbook, sheet)
+    log_access('reads', file)
+    if os.path.exists(file):
+        return cached_read(file, pd.read_parquet).copy()
+
+    return read_workbook(workbook)[sheet].copy()
+
+
+def load_workbook(workbook):
+    """ Read every dataset of a workbook, empty if neither the store nor the workbook exist """
+    if os.path.exists(os.path.join(store_folder, workbook)):
+        return {x: load_dataset(workbook, x) for x in workbooks[workbook]}
+
+    if os.path.exists(workbook_file(workbook)):
+        return {x: df.copy() for (x, df) in read_workbook(workbook).items()}
+
+    return {}
+
+
+def load_returns(suffix):
+    """ Read the backfilled return series written by backfill_calc """
+    return cached_read(returns_file(suffix), partial(pd.read_csv, index_col=0)).copy()
+
+
+def save_returns(df, suffix):
+    write_file(returns_file(suffix), df.to_csv)
+
+
+def load_series():
+    """ Stored Bloomberg series, empty if nothing has been pulled into the store yet """
+    if not os.path.exists(series_file):
+        return pd.Series([], index=pd.MultiIndex.from_arrays([[], [], pd.DatetimeIndex([])], names=['ticker', 'field', 'date']),
+                         dtype=float)
+
+    return cached_read(series_file, pd.read_parquet)['value'].copy()
+
+
+def save_series(series):
+    write_file(series_file, series.to_frame('value').to_parquet)
+
+
+def series_view(series, tickers, field, names=None):
+    """ Month end dataframe of one field for a list of tickers, with columns renamed to asset class names """
+    rows = series.index.isin([field], level='field') & series.index.isin(tickers, level='ticker')
+    df = series[rows].droplevel('field').unstack(level='ticker')
+    df = df.reindex(columns=[x for x in tickers if x in df.columns]).asfreq('M')
+
+    df.index.name = None
+    df.columns = [names.get(x, x) for x in df.columns] if names else df.columns.tolist()
+    return df
+
+
+def load_view(dataset, field):
+    """ Dataframe of one field for the tickers last pulled for a dataset of data_pull, for example
+    load_view('fixed_nonus', 'INDEX_OAS_TSY') """
+    names = {v: k for (k, v) in load_manifest()['tickers'][dataset].items()}
+    return series_view(load_series(), list(names), field, names)
+
+
+def save_output(name, sheets):
+    """ Write a workbook of model results to the output folder """
+    write_file(output_file(name), partial(write_excel, sheets))
+
+
+def save_panel(name, panel):
+    """ Write a long table of model results to the output folder """
+    write_file(panel_file(name), panel.to_parquet)
+
+
+def load_state(name):
+    """ Rolling EWMA state saved by an earlier run, None if there is none yet
+
+    The state is left out of the reads and writes recorded for the stage cache, since results moved on from it agree
+    with results built from every month up to rounding in the last bits. What the results do depend on is the code
+    building the state: ewma.py is part of the stage cache key of the stages calling it, and a state saved by another
+    version of ewma.py is built again rather than moved on.
+    """
+    if not os.path.exists(state_file(name)):
+        return None
+
+    return read_file(state_file(name), pd.read_pickle, log=False)
+
+
+def save_state(name, state):
+    write_file(state_file(name), partial(pd.to_pickle, state), log=False)
+
+
+def load_manifest():
+    if not os.path.exists(manifest_file):
+        return {}
+
+    return read_file(manifest_file, read_json)
+
+
+def save_manifest(manifest):
+    write_file(manifest_file, partial(write_json, manifest))
+
+
+def read_json(file):
+    with open(file) as f:
+        return json.load(f)
+
+
+def write_json(data, file):
+    with open(file, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def record_pull(val_dict, tickers):
+    """ Add the fetch time and the tickers pulled for each dataset to the manifest """
+    manifest = load_manifest()
+    manifest['fetched'] = datetime.now().isoformat(timespec='seconds')
+    manifest['tickers'] = tickers
+    manifest['tickers_hash'] = tickers_hash(val_dict)
+    save_manifest(manifest)
+
+
+def tickers_hash(val_dict):
+    """ Hash of every asset class name and Bloomberg code entered in the GUI """
+    tickers = sorted([k.split('_code')[0], val_dict[k.replace('_code', '_name')], v]
+                     for (k, v) in val_dict.items() if '_code' in k and v)
+    return hashlib.sha1(json.dumps(tickers).encode()).hexdigest()
+
+
+def data_needed(val_dict):
+    """ True if the store is behind the as of date or was pulled with a different set of tickers """
+    manifest = load_manifest()
+    if not manifest.get('fetched'):
+        # Data pulled before the manifest existed
+        return val_dict['as_of_date'] not in load_dataset('bloomberg_data_us', 'equity_returns').index
+
+    if manifest['tickers_hash'] != tickers_hash(val_dict):
+        return True
+
+    # Datasets read at the as of date always need a pull. Lagging datasets can end before the as of date even after a
+    # pull, only try again once a day for those
+    behind = datasets_behind(val_dict, manifest)
+    if any(x not in lagging_datasets for x in behind):
+        return True
+    return len(behind) > 0 and datetime.fromisoformat(manifest['fetched']).date() < date.today()
+
+
+def datasets_behind(val_dict, manifest=None):
+    """ Stored datasets, as workbook/sheet, whose last date is before the as of date """
+    manifest = load_manifest() if manifest is None else manifest
+    as_of_date = pd.Timestamp(val_dict['as_of_date'])
+    return sorted(x for (x, y) in manifest.get('last_dates', {}).items() if pd.Timestamp(y) < as_of_date)
+
+
+def check_as_of_date(val_dict):
+    """ Raise if a dataset the model reads at the as of date ends before it, for example after a pull made before the
+    month's data was published """
+    missing = [x for x in datasets_behind(val_dict) if x not in lagging_datasets]
+    if missing:
+        raise ValueError('Stored data ends before the as of date ' + val_dict['as_of_date'] + ' for ' + ', '.join(missing))
+
+
+def convert_workbooks():
+    """ Build the columnar store from the existing Excel workbooks """
+    for workbook in workbooks:
+        save_workbook(workbook, read_workbook(workbook))
@@ -15,6 +15,7 @@
 
 # +
 import cma_gui as cma
+import data_store
 import fixed_income_calcs
 import std_dev
 
@@ -72,7 +73,7 @@ gl_equity_return = (0.55 * us_equity_return) + (0.335 * intl_equity_return) + (0
 
 # +
 # Import returns
-df_returns_us = pd.read_csv('P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_us.csv', index_col=0)
+df_returns_us = data_store.load_returns('us')
 
 df_expected_return_us, df_beta_reference_us = beta_matrix(std_dev.exp_cov_us, std_dev.annual_adj_std_dev_us, 'equity_us_beta', 'equity_us_name')    
 
@@ -126,7 +127,7 @@ emerging_equity_return = cma.val_dict['us_inflation'] + cma.val_dict['em_equity_
 
 # +
 # Import returns
-df_returns_nonus = pd.read_csv('P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_nonus.csv', index_col=0)
+df_returns_nonus = data_store.load_returns('nonus')
 
 df_expected_return_nonus, df_beta_reference_nonus = beta_matrix(std_dev.exp_cov_nonus, std_dev.annual_adj_std_dev_nonus, 'equity_nonus_beta', 'equity_nonus_name') 
 # -
@@ -164,8 +165,7 @@ equity_returns_nonus = df_expected_return_nonus.dropna(subset=['Beta Relative To
 equity_returns_nonus = equity_returns_nonus.loc[:,'Expected Return']
 
 # Reorder
-df_equity_nonus = pd.read_excel(
-    "P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx", sheet_name='equity_returns', index_col=0)
+df_equity_nonus = data_store.load_dataset('bloomberg_data_nonus', 'equity_returns')
 expected_return_equity_nonus_order = df_equity_nonus.columns.tolist()
 
 equity_returns_nonus = equity_returns_nonus.reindex(index=expected_return_equity_nonus_order)
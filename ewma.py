@@ -0,0 +1,176 @@
+import data_store
+import hashlib
+import numpy as np
+import pandas as pd
+
+from functools import lru_cache
+
+# Exponentially weighted statistics of a window of monthly returns kept as running sums, so when the window moves on by
+# a month only the month leaving it, the month joining it and any months the backfill revised are applied. Weights
+# decay by lambda_val per month of age and are normalised to sum to one over the window, as in std_dev. The state is
+# a dictionary of
+#   version: the version of this module that built the state
+#   lambda_val, index, columns: what the state covers
+#   window: the returns in the window, months by columns
+#   normaliser: sum of the weights before they are normalised
+#   sums, weighted_sums: sums of the returns of each column, plain and weighted
+#   cross_products: weighted sums of the products of every pair of columns
+
+# Hash of the source of this module, a saved state built by another version is built again from every month rather than
+# moved on
+with open(__file__, 'rb') as f:
+    version = hashlib.sha1(f.read()).hexdigest()
+
+
+
+def decay(lambda_val, ages):
+    """ Weights before they are normalised of months of the given ages, the latest month in a window has age 0 """
+    return lambda_val ** np.asarray(ages, dtype=float)
+
+
+@lru_cache(maxsize=None)
+def weights(lambda_val, months):
+    """ Normalised weights of a window of months with the latest month last, memoised so batch and sweep runs build
+    each one once. The array is shared, so it is read only.
+    """
+    month_weights = decay(lambda_val, np.arange(months)[::-1])
+    month_weights = month_weights / month_weights.sum()
+    month_weights.flags.writeable = False
+    return month_weights
+
+
+def window_weights(returns, lambda_val):
+    """ Weight of each month for each column of a dataframe of monthly returns, aligned on its index and columns
+
+    The window is the months in returns. A column missing some months, such as a series with a shorter history, has
+    the weights of the months it has, normalised to one over them.
+    """
+    present = returns.notna().values
+    column_weights = weights(lambda_val, len(returns))[:, None] * present
+    column_weights = column_weights / column_weights.sum(axis=0)
+    return pd.DataFrame(column_weights, index=returns.index, columns=returns.columns)
+
+
+def add_months(state, rows, ages, sign=1):
+    """ Add months of returns at the given ages to the sums of state, or remove them with a sign of -1 """
+    month_weights = sign * decay(state['lambda_val'], ages)
+    state['sums'] += sign * rows.sum(axis=0)
+    state['weighted_sums'] += month_weights.dot(rows)
+    state['cross_products'] += (rows.T * month_weights).dot(rows)
+
+
+def new_state(returns, lambda_val):
+    """ State of a dataframe of monthly returns with no missing values, from every month in it """
+    window = returns.values.astype(float)
+    months, columns = window.shape
+    state = {'version': version, 'lambda_val': lambda_val, 'index': list(returns.index),
+             'columns': list(returns.columns), 'window': window, 'normaliser': decay(lambda_val, range(months)).sum(),
+             'sums': np.zeros(columns), 'weighted_sums': np.zeros(columns),
+             'cross_products': np.zeros((columns, columns))}
+    add_months(state, window, np.arange(months)[::-1])
+    return state
+
+
+def update(state, returns, lambda_val):
+    """ State for the window of returns, moved on from an earlier state
+
+    Months that left the window are removed, new months added and months whose returns changed are replaced, each in
+    O(columns²). The state is built from every month instead when there is no earlier state from this version of the
+    module for the same lambda, columns and window length, or when more than half of the window would have to be
+    applied.
+    """
+    if (state is None or state.get('version') != version or state['lambda_val'] != lambda_val
+            or state['columns'] != list(returns.columns) or len(state['index']) != len(returns)):
+        return new_state(returns, lambda_val)
+
+    index = list(returns.index)
+    months = len(index)
+    window = returns.values.astype(float)
+
+    # Months the window has moved on by
+    shift = state['index'].index(index[0]) if index[0] in state['index'] else months
+    if state['index'][shift:] != index[:months - shift]:
+        return new_state(returns, lambda_val)
+
+    revised = [x for x in range(months - shift) if not np.array_equal(state['window'][shift + x], window[x])]
+    if shift == 0 and not revised:
+        return state
+    if shift + len(revised) > months // 2:
+        return new_state(returns, lambda_val)
+
+    state = {k: (v.copy() if isinstance(v, np.ndarray) else v) for (k, v) in state.items()}
+    state['index'] = index
+
+    # Every month in the window ages by shift months
+    state['weighted_sums'] *= decay(lambda_val, shift)
+    state['cross_products'] *= decay(lambda_val, shift)
+
+    ages = months - 1 - np.arange(months)
+    add_months(state, state['window'][:shift], ages[:shift] + shift, sign=-1)
+    add_months(state, state['window'][shift:][revised], ages[revised], sign=-1)
+    add_months(state, window[revised], ages[revised])
+    add_months(state, window[months - shift:], ages[months - shift:])
+
+    state['window'] = window
+    return state
+
+
+def moments(state):
+    """ Monthly standard deviation, annual adjusted standard deviation and exponential correlation of every column, in
+    the layout of std_dev's exponential_moments and exponential_correlation
+    """
+    columns = state['columns']
+    normaliser = state['normaliser']
+    average = state['sums'] / len(state['index'])
+    weighted_mean = state['weighted_sums'] / normaliser
+
+    # Weighted covariance around the plain mean
+    covariance = (state['cross_products'] - np.outer(average, state['weighted_sums'])
+                  - np.outer(state['weighted_sums'], average)) / normaliser + np.outer(average, average)
+    monthly_variance = np.diag(covariance)
+
+    monthly_std_dev = pd.Series(np.sqrt(monthly_variance), index=columns)
+
+    annual_adj_std_dev = pd.DataFrame(np.sqrt(((1 + weighted_mean)**2 + monthly_variance)**12 - (1 + weighted_mean)**(2*12)))
+    annual_adj_std_dev.index = columns
+
+    exp_corr = pd.DataFrame(covariance / np.outer(monthly_std_dev, monthly_std_dev), index=columns, columns=columns)
+    return monthly_std_dev, annual_adj_std_dev, exp_corr
+
+
+def rolling_moments(name, returns, lambda_val):
+    """ moments of a dataframe of monthly returns with no missing values, from the state saved under name moved on to
+    the window of returns. The updated state replaces the saved one, so each name keeps a single file holding the last
+    window and lambda run, and a run with another lambda starts from every month.
+    """
+    saved = data_store.load_state(name)
+    state = update(saved, returns, lambda_val)
+    if state is not saved:
+        data_store.save_state(name, state)
+    return moments(state)
+
+
+def lambda_matrices(returns, lambdas):
+    """ Annual adjusted standard deviations, exponential covariance and correlation matrices of a dataframe of monthly
+    returns for every lambda in lambdas, from one batched product over the returns centred on their mean
+
+    Returns arrays of lambda by column and lambda by column by column, in the order of lambdas and returns.columns, as
+    std_dev's annual_adj_std_dev, exp_cov and corr_matrix_final would be for each lambda. As in std_dev, each column is
+    weighted over the months it has with window_weights, and missing months add nothing to the sums.
+    """
+    values = returns.values.astype(float)
+    lambda_weights = np.array([window_weights(returns, x).values for x in lambdas])
+
+    # Each side of a product takes the square root of its column's weights, as in std_dev's exponential_correlation
+    centred = np.nan_to_num(values - np.nanmean(values, axis=0))
+    weighted = centred * np.sqrt(lambda_weights)
+    products = np.matmul(weighted.transpose(0, 2, 1), weighted)
+
+    monthly_variance = (lambda_weights * centred**2).sum(axis=1)
+    weighted_mean = (lambda_weights * np.nan_to_num(values)).sum(axis=1)
+    annual_adj_std_dev = np.sqrt(((1 + weighted_mean)**2 + monthly_variance)**12 - (1 + weighted_mean)**(2*12))
+
+    monthly_std_dev = np.sqrt(monthly_variance)
+    exp_corr = products / (monthly_std_dev[:, :, None] * monthly_std_dev[:, None, :])
+    exp_cov = exp_corr * annual_adj_std_dev[:, :, None] * annual_adj_std_dev[:, None, :]
+    return annual_adj_std_dev, exp_cov, exp_corr
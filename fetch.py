@@ -0,0 +1,114 @@
+import data_store
+import pandas as pd
+import providers
+
+from functools import partial
+
+
+# Datasets are declared as name: (tickers, fields, dictionary) where dictionary renames tickers to asset class names
+
+def ticker_list(tickers):
+    """Allow a single ticker to be passed as a string"""
+    if isinstance(tickers, str):
+        return [tickers]
+    return list(tickers)
+
+
+def long_format(df_pull):
+    """Month end series indexed by (ticker, field, date) from a bdh response"""
+    df_pull.index = pd.to_datetime(df_pull.index)
+
+    # Adjust for varying month end dates
+    series = df_pull.resample('M', axis=0).mean().stack([0, 1])
+    series.index = series.index.reorder_levels([1, 2, 0])
+    series.index.names = ['ticker', 'field', 'date']
+    return series
+
+
+def last_dates(series):
+    """Last stored date for each (ticker, field)"""
+    return series.index.to_frame(index=False).groupby(['ticker', 'field'])['date'].max().to_dict()
+
+
+def update_series(series, start_date, *df_pulls):
+    """Overwrite refreshed months and add new months and series to the stored series"""
+    for df_pull in df_pulls:
+        if not df_pull.empty:
+            series = long_format(df_pull).combine_first(series)
+
+    # Keep the same 30 year window as a full pull
+    return series[series.index.get_level_values('date') >= start_date].sort_index()
+
+
+def workbook_series(datasets, sources, derived=None):
+    """Series indexed by (ticker, field, date) read back from the workbook datasets a pull wrote, for seeding an empty
+    series store. sources gives the dataset holding each field of each dataset as name: {field: (workbook, sheet)} and
+    derived the columns of those datasets not pulled for the dataset's tickers, as name: {field: [columns]}"""
+    derived = derived or {}
+    series = pd.Series([], index=pd.MultiIndex.from_arrays([[], [], pd.DatetimeIndex([])], names=['ticker', 'field', 'date']),
+                       dtype=float)
+    for name, fields in sources.items():
+        tickers, flds, dictionary = datasets[name]
+        for fld, (workbook, sheet) in fields.items():
+            df = data_store.load_dataset(workbook, sheet)
+            excluded = derived.get(name, {}).get(fld, [])
+            columns = {dictionary[x]: x for x in ticker_list(tickers)
+                       if dictionary[x] in df.columns and dictionary[x] not in excluded}
+            df_pull = df[list(columns)].rename(columns=columns)
+            df_pull.columns = pd.MultiIndex.from_product([df_pull.columns, [fld]])
+            series = long_format(df_pull).combine_first(series)
+    return series.sort_index()
+
+
+def dataset_tickers(datasets):
+    """Asset class name: ticker pulled for each dataset"""
+    return {name: {dictionary[x]: x for x in ticker_list(tickers)}
+            for (name, (tickers, flds, dictionary)) in datasets.items()}
+
+
+def plan_requests(datasets, series, start_date):
+    """Group the unique (ticker, field) pairs across all datasets into as few bdh requests as possible"""
+    stored = last_dates(series)
+
+    # Re-pull the last stored month in case it was captured before month end
+    pair_start = {}
+    for (tickers, flds, dictionary) in datasets.values():
+        for ticker in ticker_list(tickers):
+            for fld in flds:
+                pair_start[(ticker, fld)] = stored.get((ticker, fld), start_date)
+
+    ticker_fields = {}
+    for (ticker, fld), start in pair_start.items():
+        ticker_fields.setdefault(ticker, {})[fld] = start
+
+    # Tickers needing the same fields from the same date share a request
+    requests = {}
+    for ticker, fld_start in ticker_fields.items():
+        key = (tuple(sorted(fld_start)), min(fld_start.values()))
+        requests.setdefault(key, []).append(ticker)
+
+    return [(tickers, list(flds), start) for ((flds, start), tickers) in requests.items()]
+
+
+def dataset_fields(dataset, series):
+    """One renamed, month end dataframe per field of a dataset"""
+    tickers, flds, dictionary = dataset
+    return {fld: data_store.series_view(series, ticker_list(tickers), fld, dictionary) for fld in flds}
+
+
+def fetch_tasks(datasets, series, start_date, end_date, provider=providers.bloomberg):
+    """Scheduler tasks that pull each unique (ticker, field) pair once, merge the pulls into the stored series and
+    slice each dataset from the result"""
+    start_date = pd.Timestamp(start_date)
+    requests = plan_requests(datasets, series, start_date)
+
+    tasks = {}
+    for i, (tickers, flds, request_start) in enumerate(requests):
+        tasks['request_' + str(i)] = (partial(provider, tickers, flds, request_start, end_date, 'M'), [])
+
+    tasks['series'] = (partial(update_series, series, start_date), list(tasks))
+
+    for name, dataset in datasets.items():
+        tasks[name] = (partial(dataset_fields, dataset), ['series'])
+
+    return tasks
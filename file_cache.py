@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import shutil
+
+from functools import partial
+
+
+def checksum(file):
+    """ SHA-256 of a file, read in blocks """
+    sha = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(partial(f.read, 1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def temp_file(file):
+    """ Temporary file next to the target, keeping the extension so writers can infer the format """
+    folder, name = os.path.split(file)
+    return os.path.join(folder, '.tmp' + str(os.getpid()) + '_' + name)
+
+
+def read_stamp(local_file):
+    """ Size and modification time of the shared file a local copy was taken from, plus the checksum of the copy """
+    if not os.path.exists(local_file + '.stamp'):
+        return {}
+
+    with open(local_file + '.stamp') as f:
+        return json.load(f)
+
+
+def write_stamp(local_file, stat, sha):
+    with open(local_file + '.stamp', 'w') as f:
+        json.dump({'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha}, f)
+
+
+def local_copy(file, local_file):
+    """ Path to an up to date local copy of a shared file, copying it down if it is missing, stale or corrupt """
+    stat = os.stat(file)
+    stamp = read_stamp(local_file)
+    if (stamp.get('size') == stat.st_size and stamp.get('mtime') == stat.st_mtime and os.path.exists(local_file)
+            and checksum(local_file) == stamp['sha256']):
+        return local_file
+
+    os.makedirs(os.path.dirname(local_file), exist_ok=True)
+    local_tmp = temp_file(local_file)
+    shutil.copyfile(file, local_tmp)
+
+    # Make sure the shared file was not replaced while it was being copied
+    if os.stat(file).st_mtime != stat.st_mtime or os.path.getsize(local_tmp) != stat.st_size:
+        os.remove(local_tmp)
+        raise OSError(file + ' changed while it was being copied, try again')
+
+    sha = checksum(local_tmp)
+    os.replace(local_tmp, local_file)
+    write_stamp(local_file, stat, sha)
+    return local_file
+
+
+def write_file(file, write, local_file=None):
+    """ Write a shared file in one step so readers never see a partial file, keeping the local copy in step
+
+    write is called with the path to write to. With a local copy the file is written locally first and then copied to
+    the shared folder.
+    """
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    if local_file is None:
+        tmp = temp_file(file)
+        write(tmp)
+        os.replace(tmp, file)
+        return
+
+    os.makedirs(os.path.dirname(local_file), exist_ok=True)
+    local_tmp = temp_file(local_file)
+    write(local_tmp)
+
+    tmp = temp_file(file)
+    shutil.copyfile(local_tmp, tmp)
+    os.replace(tmp, file)
+
+    sha = checksum(local_tmp)
+    os.replace(local_tmp, local_file)
+    write_stamp(local_file, os.stat(file), sha)
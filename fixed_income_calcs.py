@@ -16,6 +16,7 @@
 # +
 import backfill_calc
 import cma_gui as cma
+import data_store
 import math
 import numpy as np
 import operator
@@ -213,7 +214,7 @@ def annual_returns(current_yields, future_yields, future_durations, default_impa
 first_date = backfill_calc.first_date
 last_date = backfill_calc.last_date
 
-term_file = r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\term_structure_data.xlsx'
+term_workbook = 'term_structure_data'
 # -
 
 # # TERM STRUCTURES
@@ -222,8 +223,8 @@ term_file = r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\term_structure_dat
 
 # +
 # Read in data as of last date and convert to list, 
-current_yield_us = (pd.read_excel(term_file, sheet_name='us_treas_yld', index_col=0).loc[last_date,:] / 100).to_list()
-current_duration_us = (pd.read_excel(term_file, sheet_name='us_treas_dur', index_col=0).loc[last_date,:]).to_list()
+current_yield_us = (data_store.load_dataset(term_workbook, 'us_treas_yld').loc[last_date,:] / 100).to_list()
+current_duration_us = (data_store.load_dataset(term_workbook, 'us_treas_dur').loc[last_date,:]).to_list()
 
 # Term premium
 term_premium_us = [cma.val_dict['term_prem_3mo'], cma.val_dict['term_prem_5yr']/100, cma.val_dict['term_prem_10yr']/100, cma.val_dict['term_prem_30yr']/100]
@@ -244,10 +245,10 @@ df_yield_curves_us = curve_final(df_yield_params_us)
 
 # +
 # Read in data as of last date and convert to list, 
-current_yield_gl = (pd.read_excel(term_file, sheet_name='gl_treas_yld', index_col=0).loc[last_date,:] / 100).to_list()
+current_yield_gl = (data_store.load_dataset(term_workbook, 'gl_treas_yld').loc[last_date,:] / 100).to_list()
 current_yield_gl.insert(0, 0.010)
 
-current_duration_gl = (pd.read_excel(term_file, sheet_name='gl_treas_dur', index_col=0).loc[last_date,:]).to_list()
+current_duration_gl = (data_store.load_dataset(term_workbook, 'gl_treas_dur').loc[last_date,:]).to_list()
 current_duration_gl.insert(0, 0.25)
 
 # Term premium
@@ -274,16 +275,16 @@ df_yield_curves_gl = curve_final(df_yield_params_gl)
 
 # +
 # Read in data as of last date and convert to list, 
-current_yield_gl_agg = (pd.read_excel(term_file, sheet_name='gl_agg_yld', index_col=0).loc[last_date,:] / 100).to_list()
+current_yield_gl_agg = (data_store.load_dataset(term_workbook, 'gl_agg_yld').loc[last_date,:] / 100).to_list()
 current_yield_gl_agg.insert(0, 0)
 
-current_spread_gl_agg = (pd.read_excel(term_file, sheet_name='gl_agg_spreads', index_col=0).loc[last_date,:] / 100).to_list()
+current_spread_gl_agg = (data_store.load_dataset(term_workbook, 'gl_agg_spreads').loc[last_date,:] / 100).to_list()
 current_spread_gl_agg.insert(0, 0)
 
 # Current yield calculated as agg yield minus spread
 current_yield_gl_exus = list(map(operator.sub, current_yield_gl_agg, current_spread_gl_agg))
 
-current_duration_gl_exus = (pd.read_excel(term_file, sheet_name='gl_agg_dur', index_col=0).loc[last_date,:]).to_list()
+current_duration_gl_exus = (data_store.load_dataset(term_workbook, 'gl_agg_dur').loc[last_date,:]).to_list()
 current_duration_gl_exus.insert(0, 0.25)
 
 # Term premium
@@ -310,10 +311,10 @@ df_yield_curves_gl_exus = curve_final(df_yield_params_gl_exus)
 
 # +
 # Read in data as of last date and convert to list, 
-current_yield_em = (pd.read_excel(term_file, sheet_name='em_treas_yld', index_col=0).loc[last_date,:] / 100).to_list()
+current_yield_em = (data_store.load_dataset(term_workbook, 'em_treas_yld').loc[last_date,:] / 100).to_list()
 current_yield_em.insert(0, 0.045)
 
-current_duration_em = (pd.read_excel(term_file, sheet_name='em_treas_dur', index_col=0).loc[last_date,:]).to_list()
+current_duration_em = (data_store.load_dataset(term_workbook, 'em_treas_dur').loc[last_date,:]).to_list()
 current_duration_em.insert(0, 0.25)
 
 # Term premium
@@ -342,19 +343,19 @@ df_yield_curves_em = curve_final(df_yield_params_em)
 
 # +
 # Import Current Data
-us_fixed_file = r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_us.xlsx'
+us_fixed_workbook = 'bloomberg_data_us'
 
 # Establish name orders
 asset_order = {k:v for (k,v) in cma.val_dict.items() if 'fixed_us_name' in k}
 asset_order = [i for i in asset_order.values()if i !='']
 
-yield_us = (pd.read_excel(us_fixed_file, sheet_name='fixed_yields', index_col=0).loc[last_date,:] / 100).reindex(index=asset_order)
-duration_us = (pd.read_excel(us_fixed_file, sheet_name='fixed_durations', index_col=0).loc[last_date,:]).reindex(index=asset_order)
+yield_us = (data_store.load_dataset(us_fixed_workbook, 'fixed_yields').loc[last_date,:] / 100).reindex(index=asset_order)
+duration_us = (data_store.load_dataset(us_fixed_workbook, 'fixed_durations').loc[last_date,:]).reindex(index=asset_order)
 
-spread_us = (pd.read_excel(us_fixed_file, sheet_name='fixed_spreads', index_col=0).loc[last_date,:] / 100).reindex(index=asset_order)
+spread_us = (data_store.load_dataset(us_fixed_workbook, 'fixed_spreads').loc[last_date,:] / 100).reindex(index=asset_order)
 spread_us['U.S. TIPS'] = -0.0205
 spread_us['U.S. Short Municipal'] = -0.0020
-spread_us_history = (pd.read_excel(us_fixed_file, sheet_name='fixed_spreads', index_col=0).loc[first_date:last_date,:] / 100).reindex(columns=asset_order)
+spread_us_history = (data_store.load_dataset(us_fixed_workbook, 'fixed_spreads').loc[first_date:last_date,:] / 100).reindex(columns=asset_order)
 # -
 
 term_assign_us = term_assignment('us')
@@ -440,13 +441,13 @@ fixed_returns_us = ((annual_returns_us + 1).product(axis=0)**(1/10)-1)
 
 # +
 # Import Current Data
-nonus_fixed_file = r'P:\\Advisory\\Research\\Automation\\CMAs\\Data\\bloomberg_data_nonus.xlsx'
+nonus_fixed_workbook = 'bloomberg_data_nonus'
 
-yield_nonus = pd.read_excel(nonus_fixed_file, sheet_name='fixed_yields', index_col=0).loc[last_date,:] / 100
-duration_nonus = pd.read_excel(nonus_fixed_file, sheet_name='fixed_durations', index_col=0).loc[last_date,:]
-spread_nonus = pd.read_excel(nonus_fixed_file, sheet_name='fixed_spreads', index_col=0).loc[last_date,:] / 100
+yield_nonus = data_store.load_dataset(nonus_fixed_workbook, 'fixed_yields').loc[last_date,:] / 100
+duration_nonus = data_store.load_dataset(nonus_fixed_workbook, 'fixed_durations').loc[last_date,:]
+spread_nonus = data_store.load_dataset(nonus_fixed_workbook, 'fixed_spreads').loc[last_date,:] / 100
 
-spread_nonus_history = pd.read_excel(nonus_fixed_file, sheet_name='fixed_spreads', index_col=0).loc[first_date:last_date,:] / 100
+spread_nonus_history = data_store.load_dataset(nonus_fixed_workbook, 'fixed_spreads').loc[first_date:last_date,:] / 100
 
 # +
 term_assign_nonus = term_assignment('nonus')
@@ -0,0 +1,338 @@
+import data_store
+import importlib
+import os
+import re
+import scheduler
+import stage_cache
+import sys
+import types
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Stages of the model as name: (module, inputs, outputs). Inputs are the stages a module reads results from, either
+# through module attributes or through the files they write to the data folder. Outputs are the module attributes
+# other stages and main.py use.
+stages = {
+    'data_pull': ('data_pull', [], []),
+    'backfill': ('backfill_calc', ['data_pull'], ['first_date', 'last_date']),
+    'std_dev': ('std_dev', ['backfill'], ['exp_cov_us', 'annual_adj_std_dev_us', 'corr_matrix_final_us', 'exp_cov_nonus',
+                                          'annual_adj_std_dev_nonus', 'corr_matrix_final_nonus']),
+    'fixed_income': ('fixed_income_calcs', ['data_pull', 'backfill'], ['fixed_returns_us', 'fixed_returns_nonus',
+                                                                       'income_return_nonus']),
+    'equity': ('equity_calcs', ['backfill', 'fixed_income', 'std_dev'], ['cash', 'equity_returns_us', 'equity_returns_nonus',
+                                                                         'df_beta_reference_us', 'df_beta_reference_nonus',
+                                                                         'us_equity_return', 'gl_equity_return']),
+    'alts': ('alts', ['equity', 'std_dev'], ['alts_returns_us', 'alts_returns_nonus']),
+    }
+
+# Markdown sections of each stage module that only the other branch needs, skipped when the US and Non-US branches run in
+# separate processes. Sections are named by their headings, nested headings joined with a /. The Non-US branch keeps
+# the US fixed income and equity building blocks since its cash return is the U.S. Treasury Bills return.
+branch_skip = {
+    'us': {'backfill': ['Non-USD'], 'std_dev': ['Non-USD'], 'fixed_income': ['CMA RETURNS/NON-US CMAs'],
+           'equity': ['NON-USD'], 'alts': ['Non USD']},
+    'nonus': {'backfill': ['USD'], 'std_dev': ['USD'], 'equity': ['USD/Beta Calcs'], 'alts': ['US']},
+    }
+
+# Markdown sections of each stage module that depend on the currency and country inflation, the only inputs that differ
+# between the runs of a currency batch
+currency_sections = {
+    'backfill': ['Non-USD'],
+    'std_dev': ['Non-USD'],
+    'fixed_income': ['CMA RETURNS/NON-US CMAs'],
+    'equity': ['NON-USD'],
+    'alts': ['Non USD'],
+    }
+
+# Stages never taken from the stage cache, data_pull talks to Bloomberg and is skipped instead when nothing is needed
+uncached = ['data_pull']
+
+# Outputs of the stages run in this process
+results = {}
+
+# What each stage in results read, as stage: (reads recorded by stage_cache, values of the val_dict keys read)
+stage_reads = {}
+
+
+def module_source(module_name, skip_sections=(), only_sections=None):
+    """ Source of a stage module without the sections in skip_sections, or without everything outside only_sections when
+    it is given. Sections run from their heading to the next heading at the same or a higher level. Blank lines are left
+    in place of the removed lines so tracebacks keep their line numbers.
+    """
+    file = os.path.join(os.path.dirname(os.path.abspath(__file__)), module_name + '.py')
+    with open(file) as f:
+        lines = f.read().splitlines(True)
+
+    headings = []
+    for i, line in enumerate(lines):
+        heading = re.match(r'# (#+) (.*?)\s*$', line)
+        if heading:
+            headings = headings[:len(heading.group(1)) - 1] + [heading.group(2)]
+
+        # The section a line is in and every section above it
+        sections = ['/'.join(headings[:j + 1]) for j in range(len(headings))]
+        if any(x in skip_sections for x in sections) or (only_sections is not None
+                                                         and not any(x in only_sections for x in sections)):
+            lines[i] = '\n'
+
+    return file, ''.join(lines)
+
+
+def helper_sources(module_name):
+    """ Source of every module of this folder a stage module imports, directly or through other such modules, as
+    module: source. Stage modules are left out since their outputs are inputs of the stage, and so is cma_gui since the
+    val_dict keys read from it are tracked.
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    skipped = {x[0] for x in stages.values()} | {'cma_gui'}
+    sources = {}
+    pending = [module_name]
+    while pending:
+        with open(os.path.join(folder, pending.pop() + '.py')) as f:
+            imports = re.findall(r'^(?:import|from) (\w+)', f.read(), re.M)
+        for imported in imports:
+            file = os.path.join(folder, imported + '.py')
+            if imported not in skipped and imported not in sources and os.path.exists(file):
+                with open(file) as f:
+                    sources[imported] = f.read()
+                pending.append(imported)
+    return sources
+
+
+def run_stage(name, *inputs, skip_sections=(), cache=True):
+    """ Run a stage's module from its source into a new module object and return the stage outputs
+
+    The module replaces any earlier copy in sys.modules, so modules of later stages that import it get these results
+    instead of running it again. inputs are the outputs of the input stages, which the module reads through its imports.
+    Outputs of skipped sections are left out.
+
+    With cache, outputs are taken from the stage cache when nothing the stage reads has changed since it was stored,
+    including the source of the helper modules it calls, and the module in sys.modules then only holds the outputs.
+    """
+    import cma_gui as cma
+
+    module_name, outputs = stages[name][0], stages[name][2]
+    file, source = module_source(module_name, skip_sections)
+
+    if not isinstance(cma.val_dict, stage_cache.TrackedDict):
+        cma.val_dict = stage_cache.TrackedDict(cma.val_dict)
+
+    cache = cache and name not in uncached
+    if cache:
+        # Outputs of the input stages as their modules hold them, whether they ran in this call or earlier
+        stage_inputs = {x: {y: getattr(sys.modules[stages[x][0]], y, None) for y in stages[x][2]}
+                        for x in stages[name][1] if stages[x][0] in sys.modules}
+        base = stage_cache.base_key(name, source, skip_sections, stage_inputs, helper_sources(module_name))
+        cached = stage_cache.load(name, base, cma.val_dict)
+        if cached is not None:
+            stage_outputs, deps = cached
+            module = types.ModuleType(module_name)
+            module.__file__ = file
+            module.__dict__.update(stage_outputs)
+            module.from_cache = True
+            sys.modules[module_name] = module
+            stage_reads[name] = (deps, stage_cache.read_values(deps, cma.val_dict))
+            return stage_outputs
+
+    module = types.ModuleType(module_name)
+    module.__file__ = file
+    sys.modules[module_name] = module
+    stage_cache.start_tracking()
+    try:
+        exec(compile(source, file, 'exec'), module.__dict__)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    finally:
+        deps, written = stage_cache.stop_tracking()
+
+    missing = [x for x in outputs if not hasattr(module, x)]
+    if missing and not skip_sections:
+        raise ValueError(name + ' did not produce ' + ', '.join(missing))
+
+    stage_outputs = {x: getattr(module, x) for x in outputs if x not in missing}
+    stage_reads[name] = (deps, stage_cache.read_values(deps, cma.val_dict))
+    if cache:
+        stage_cache.save(name, base, deps, stage_outputs, written, cma.val_dict)
+    return stage_outputs
+
+
+def upstream(names):
+    """ Stages in names and every stage they depend on """
+    found = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in found:
+            found.add(name)
+            pending += stages[name][1]
+    return found
+
+
+def downstream(names):
+    """ Stages in names and every stage depending on them """
+    found = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, (module_name, inputs, outputs) in stages.items():
+            if name not in found and found & set(inputs):
+                found.add(name)
+                changed = True
+    return found
+
+
+def changed_stages():
+    """ Stages in results that read a val_dict key whose value has changed since they ran """
+    import cma_gui as cma
+
+    return [x for x in results if x in stage_reads
+            and stage_cache.read_values(stage_reads[x][0], cma.val_dict) != stage_reads[x][1]]
+
+
+def stages_reading(keys):
+    """ Stages that read any of the val_dict keys the last time they ran in this process, and every stage downstream of
+    them
+    """
+    return downstream([x for (x, (deps, values)) in stage_reads.items() if set(keys) & set(values)])
+
+
+def run(targets=None, skip=(), rerun=(), max_workers=1, cache=True):
+    """ Run the stages needed for targets (all stages by default) and return the outputs of every stage run so far
+
+    Stages already run in this process are reused, apart from the stages in rerun, the stages that read a val_dict key
+    changed since they ran, and everything downstream of them. So after changing an assumption in cma.val_dict only the
+    stages it affects run again. Stages in skip are not run and their inputs are taken as already on disk, for example
+    data_pull when the stored data is up to date. cache turns the stage cache on or off for the stages run.
+    """
+    unknown = [x for x in list(targets or []) + list(skip) + list(rerun) if x not in stages]
+    if unknown:
+        raise ValueError('Unknown stages: ' + ', '.join(unknown))
+
+    # Outputs downstream of a rerun stage are out of date even if they are not needed for these targets
+    for name in downstream(list(rerun) + changed_stages()):
+        results.pop(name, None)
+        stage_reads.pop(name, None)
+
+    needed = upstream(targets or stages)
+    to_run = [x for x in stages if x in needed and x not in skip and x not in results]
+
+    tasks = {name: (partial(run_stage, name, cache=cache), [x for x in stages[name][1] if x in to_run])
+             for name in to_run}
+    results.update(scheduler.run_tasks(tasks, max_workers=max_workers))
+    return results
+
+
+def install_inputs(val_dict, end_date):
+    """ Stand in for cma_gui with the given inputs, so stage modules importing it never open the GUI. Used by the worker
+    processes of run_branches and by the command line.
+    """
+    if 'cma_gui' not in sys.modules:
+        cma = types.ModuleType('cma_gui')
+        cma.val_dict = val_dict
+        cma.end_date = end_date
+        sys.modules['cma_gui'] = cma
+
+
+def run_branch(branch, skip=(), cache=True):
+    """ Run every stage for one branch in this process and return the outputs it produced """
+    tasks = {name: (partial(run_stage, name, skip_sections=branch_skip[branch].get(name, []), cache=cache),
+                    [x for x in stages[name][1] if x not in skip]) for name in stages if name not in skip}
+    return scheduler.run_tasks(tasks, max_workers=1)
+
+
+def run_branches(skip=(), cache=True):
+    """ Run the US and Non-US branches in two worker processes and return the combined outputs of every stage
+
+    data_pull is shared by both branches, so it runs once in this process before the branches start.
+    """
+    import cma_gui as cma
+
+    if 'data_pull' not in skip:
+        run(targets=['data_pull'])
+    skip = list(skip) + ['data_pull']
+
+    with ProcessPoolExecutor(max_workers=2, initializer=install_inputs, initargs=(cma.val_dict, cma.end_date)) as executor:
+        branches = [executor.submit(run_branch, x, skip, cache) for x in branch_skip]
+        branch_results = [x.result() for x in branches]
+
+    outputs = {}
+    for branch_result in branch_results:
+        for name, stage_outputs in branch_result.items():
+            outputs.setdefault(name, {}).update(stage_outputs)
+
+    for name, stage_outputs in outputs.items():
+        missing = [x for x in stages[name][2] if x not in stage_outputs]
+        if missing:
+            raise ValueError(name + ' did not produce ' + ', '.join(missing) + ' in either branch')
+
+    return outputs
+
+
+def rerun_sections(name, sections):
+    """ Run some sections of a stage already run in this process again, in a copy of its module
+
+    The copy replaces the module in sys.modules and the original is left untouched. Module level imports in the copy are
+    bound again, so the sections read the modules of any stages re-run before this one.
+    """
+    module_name, outputs = stages[name][0], stages[name][2]
+    file, source = module_source(module_name, only_sections=sections)
+
+    module = types.ModuleType(module_name)
+    module.__dict__.update(sys.modules[module_name].__dict__)
+    with open(file) as f:
+        for imported, alias in re.findall(r'^import (\w+)(?: as (\w+))?', f.read(), re.M):
+            module.__dict__[alias or imported] = importlib.import_module(imported)
+
+    exec(compile(source, file, 'exec'), module.__dict__)
+    sys.modules[module_name] = module
+    return {x: getattr(module, x) for x in outputs}
+
+
+def run_currencies(currencies, skip=()):
+    """ Outputs of every stage for each currency in a dictionary of currency: country inflation
+
+    The currency independent work, including the term structures and everything on the US side, runs once. Only the
+    sections in currency_sections run again for each currency. The returns files are left as the base currency wrote
+    them.
+    """
+    import cma_gui as cma
+
+    # Sections are re-run in copies of the full modules, so stages taken from the stage cache are run again
+    from_cache = [x for x in results if getattr(sys.modules.get(stages[x][0]), 'from_cache', False)]
+    run(skip=skip, rerun=from_cache, cache=False)
+    shared_modules = {x: sys.modules[stages[x][0]] for x in stages if x not in skip}
+    base_inputs = (cma.val_dict['currency'], cma.val_dict['country_inflation'])
+
+    # The backfill sections rewrite the returns files for each currency, the base currency's files are put back after
+    base_returns = {}
+    for suffix in ('us', 'nonus'):
+        file = data_store.returns_file(suffix)
+        if os.path.exists(file):
+            with open(file, 'rb') as f:
+                base_returns[file] = f.read()
+
+    batch = {}
+    try:
+        for currency, inflation in currencies.items():
+            cma.val_dict['currency'] = currency
+            cma.val_dict['country_inflation'] = inflation
+
+            outputs = {x: dict(y) for (x, y) in results.items()}
+            for name in stages:
+                if name in currency_sections:
+                    outputs[name] = rerun_sections(name, currency_sections[name])
+            batch[currency] = outputs
+
+            # Each currency starts again from the shared modules
+            for name, module in shared_modules.items():
+                sys.modules[module.__name__] = module
+    finally:
+        cma.val_dict['currency'], cma.val_dict['country_inflation'] = base_inputs
+        for name, module in shared_modules.items():
+            sys.modules[module.__name__] = module
+        for file, content in base_returns.items():
+            data_store.write_file(file, partial(stage_cache.write_bytes, content))
+
+    return batch
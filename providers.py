@@ -0,0 +1,51 @@
+import data_store
+import os
+import pandas as pd
+
+
+# Providers all take (tickers, fields, start, end, per) and return a dataframe of dates by (ticker, field) columns, in
+# the same shape as xbbg's bdh
+
+def bloomberg(tickers, fields, start, end, per='M'):
+    """ Live history from the Bloomberg terminal """
+    # Imported here so the other providers work on machines without xbbg
+    from xbbg import blp
+
+    return blp.bdh(tickers=tickers, flds=fields, start_date=start.strftime('%m-%d-%Y'),
+                   end_date=end.strftime('%m-%d-%Y'), Per=per)
+
+
+def replay(tickers, fields, start, end, per='M'):
+    """ History recorded in the series store by earlier pulls, for runs without a terminal """
+    if per != 'M':
+        raise ValueError('The series store only holds monthly data, cannot replay Per=' + per)
+
+    series = data_store.load_series()
+    recorded = set(zip(series.index.get_level_values('ticker'), series.index.get_level_values('field')))
+
+    # As with bdh, fields with no data for a ticker are left out, but a ticker with none of the fields is an error
+    missing = [x for x in tickers if not any((x, y) in recorded for y in fields)]
+    if missing:
+        raise ValueError('The series store has no recorded data for ' + ', '.join(missing) + ' ' + ', '.join(fields)
+                         + ', pull them from Bloomberg or seed the store from the workbooks first')
+
+    dates = series.index.get_level_values('date')
+    rows = (series.index.isin(tickers, level='ticker') & series.index.isin(fields, level='field')
+            & (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end)))
+
+    df = series[rows].unstack(level=['ticker', 'field'])
+    df.index.name = None
+    return df.reindex(columns=[(x, y) for x in tickers for y in fields if (x, y) in df.columns])
+
+
+providers = {'bloomberg': bloomberg, 'replay': replay}
+
+# Provider used by data_pull, set CMA_PROVIDER=replay to run without a terminal
+default_provider = os.environ.get('CMA_PROVIDER', 'bloomberg')
+
+
+def get_provider(name=None):
+    name = name or default_provider
+    if name not in providers:
+        raise ValueError('Unknown data provider ' + name + ', expected one of ' + ', '.join(providers))
+    return providers[name]
@@ -0,0 +1,75 @@
+import data_store
+import pandas as pd
+
+
+def final_us(outputs, val_dict):
+    """ Expected returns and standard deviations of the US asset classes from the pipeline outputs """
+    df_final_us = pd.concat([outputs['equity']['equity_returns_us'], outputs['fixed_income']['fixed_returns_us']*100, outputs['alts']['alts_returns_us']])
+    df_final_us = pd.DataFrame(df_final_us)
+    df_final_us = df_final_us.rename(columns={0: "Expected Return"})
+
+    # Combine Expected Returns with Standard Deviation
+    df_final_us = df_final_us.merge(outputs['std_dev']['annual_adj_std_dev_us']*100, left_index=True, right_index=True)
+    df_final_us = df_final_us.rename(columns={0: "Standard Deviation"})
+
+    # Convert to ints and round
+    df_final_us['Expected Return'] = pd.to_numeric(df_final_us['Expected Return']).round(1)
+    df_final_us['Standard Deviation'] = pd.to_numeric(df_final_us['Standard Deviation']).round(1)
+
+    # Reorder
+    equity_us_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'equity_us_name' in k}.values())))
+    fixed_us_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'fixed_us_name' in k}.values())))
+    alts_us_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'alts_us_name' in k}.values())))
+
+    order_name_us = equity_us_name + fixed_us_name + alts_us_name
+    df_final_us = df_final_us.reindex(index=order_name_us)
+
+    return df_final_us
+
+
+def final_nonus(outputs, val_dict):
+    """ Expected returns, standard deviations and income returns of the Non-US asset classes from the pipeline outputs """
+    df_final_nonus = pd.concat([outputs['equity']['equity_returns_nonus'], outputs['fixed_income']['fixed_returns_nonus']*100, outputs['alts']['alts_returns_nonus']])
+    df_final_nonus = pd.DataFrame(df_final_nonus)
+
+    df_final_nonus = df_final_nonus.rename(columns={0: "Expected Return"})
+
+    # Combine Expected Returns with Standard Deviation
+    df_final_nonus = df_final_nonus.merge(outputs['std_dev']['annual_adj_std_dev_nonus']*100, left_index=True, right_index=True)
+    df_final_nonus = df_final_nonus.rename(columns={0: "Standard Deviation"})
+
+    # Add Income Return
+    df_final_nonus = df_final_nonus.join(pd.DataFrame(outputs['fixed_income']['income_return_nonus']*100)).rename(columns={0: "Income Return"})
+
+    df_final_nonus.loc[['U.S. Equity', 'U.S. Small Cap Equity'], 'Income Return'] = val_dict['us_equity_income']
+    df_final_nonus.loc[['Europe Ex-UK Equity', 'Europe Small Cap Equity'], 'Income Return'] = val_dict['europe_ex_uk_equity_income']
+    df_final_nonus.loc['UK Equity', 'Income Return'] = val_dict['uk_equity_income']
+    df_final_nonus.loc[['Japan Equity', 'Japan Small Cap Equity'], 'Income Return'] = val_dict['japan_equity_income']
+    df_final_nonus.loc['Developed Market Pacific Ex-Japan Equity', 'Income Return'] = val_dict['apac_ex_japan_equity_income']
+    df_final_nonus.loc['Global Emerging Markets Equity', 'Income Return'] = val_dict['em_equity_income']
+
+    df_final_nonus.loc[list(filter(None, list({k:v for (k,v) in val_dict.items() if 'alts_nonus_name' in k}.values()))),'Income Return'] = 0
+
+    # Convert to ints and round
+    df_final_nonus['Expected Return'] = pd.to_numeric(df_final_nonus['Expected Return']).round(1)
+    df_final_nonus['Standard Deviation'] = pd.to_numeric(df_final_nonus['Standard Deviation']).round(1)
+    df_final_nonus['Income Return'] = pd.to_numeric(df_final_nonus['Income Return']).round(1)
+
+    # Reorder
+    equity_nonus_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'equity_nonus_name' in k}.values())))
+    fixed_nonus_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'fixed_nonus_name' in k}.values())))
+    alts_nonus_name = list(filter(None, list({k:v for (k,v) in val_dict.items() if 'alts_nonus_name' in k}.values())))
+
+    order_name_nonus = equity_nonus_name + fixed_nonus_name + alts_nonus_name
+    df_final_nonus = df_final_nonus.reindex(index=order_name_nonus)
+
+    return df_final_nonus
+
+
+def save_report(currency, outputs, val_dict):
+    """ Write the final tables and correlation matrices for one currency to its own output workbook """
+    data_store.save_output('cma_' + currency, {
+        'US': final_us(outputs, val_dict),
+        'NonUS': final_nonus(outputs, val_dict),
+        'US Correlation': outputs['std_dev']['corr_matrix_final_us'],
+        'NonUS Correlation': outputs['std_dev']['corr_matrix_final_nonus']})
@@ -0,0 +1,40 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_tasks(tasks, max_workers=4):
+    """ Run a dictionary of name: (function, dependencies) tasks, starting each task as soon as its dependencies finish
+
+    Each function is called with the results of its dependencies as positional arguments, in the order they are listed.
+    Returns a dictionary of name: result.
+    """
+    for name, (func, dependencies) in tasks.items():
+        missing = [x for x in dependencies if x not in tasks]
+        if missing:
+            raise ValueError(name + ' depends on undefined tasks: ' + ', '.join(missing))
+
+    results = {}
+    pending = dict(tasks)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Submit every task whose dependencies have all finished
+            ready = [name for (name, (func, dependencies)) in pending.items() if all(x in results for x in dependencies)]
+            for name in ready:
+                func, dependencies = pending.pop(name)
+                running[executor.submit(func, *[results[x] for x in dependencies])] = name
+
+            if not running:
+                raise ValueError('Circular dependency between tasks: ' + ', '.join(pending))
+
+            done, not_done = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for future_left in not_done:
+                        future_left.cancel()
+                    raise
+
+    return results
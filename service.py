@@ -0,0 +1,131 @@
+import argparse
+import assumptions
+import cli
+import data_store
+import json
+import pipeline
+import report
+import threading
+import time
+import traceback
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Settings every request starts from, as given to build_val_dict. A request's assumptions are applied on top of them.
+base_settings = []
+
+# Stages not run for requests, the service answers from the stored data and never pulls
+skip = ['data_pull']
+
+# Requests share the stage results held in this process, so they run one at a time
+lock = threading.Lock()
+
+
+def table_json(df):
+    """ Dataframe as a dictionary of row: {column: value}, with missing values as null """
+    return json.loads(df.to_json(orient='index'))
+
+
+def evaluate(settings):
+    """ Final tables and correlation matrices for a dictionary of assumptions, in the layout cli.py's config files use
+
+    Only the stages reading an assumption that differs from the previous request run again, unchanged stages come from
+    the results held in memory or the stage cache. An as of date past the stored data raises a ValueError before any
+    stage runs, so the shared returns files are left as they are.
+    """
+    import cma_gui as cma
+
+    val_dict = assumptions.build_val_dict(*base_settings, settings)
+    data_store.check_as_of_date(val_dict)
+    with lock:
+        start = time.time()
+        cma.val_dict.clear()
+        cma.val_dict.update(val_dict)
+        outputs = pipeline.run(skip=skip)
+
+        return {
+            'as_of_date': val_dict['as_of_date'],
+            'currency': val_dict['currency'],
+            'final_us': table_json(report.final_us(outputs, val_dict)),
+            'final_nonus': table_json(report.final_nonus(outputs, val_dict)),
+            'corr_matrix_us': table_json(outputs['std_dev']['corr_matrix_final_us']),
+            'corr_matrix_nonus': table_json(outputs['std_dev']['corr_matrix_final_nonus']),
+            'seconds': round(time.time() - start, 3),
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """ GET /assumptions returns the base assumptions, POST /run with a JSON dictionary of assumptions returns the
+    results for them
+    """
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/assumptions':
+            self.send_json(200, assumptions.build_val_dict(*base_settings))
+        else:
+            self.send_json(404, {'error': 'Unknown path ' + self.path})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/run':
+            self.send_json(404, {'error': 'Unknown path ' + self.path})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            settings = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(settings, dict):
+                raise ValueError('Expected a JSON object of assumptions')
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        try:
+            self.send_json(200, evaluate(settings))
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception:
+            # Details stay in the server's log rather than going back to the client
+            traceback.print_exc()
+            self.send_json(500, {'error': 'Internal error running the model, see the service log'})
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Serve the capital market assumptions over HTTP with the data kept in memory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--config', action='append', default=[],
+                        help='JSON or YAML file of base assumptions, later files override earlier ones')
+    parser.add_argument('--set', action='append', default=[], type=cli.parse_setting, metavar='KEY=VALUE',
+                        help='Base assumption by its val_dict key, for example --set us_inflation=2.4')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    base_settings[:] = [assumptions.load_file(x) for x in args.config] + [dict(args.set)]
+    val_dict = assumptions.build_val_dict(*base_settings)
+    pipeline.install_inputs(val_dict, assumptions.end_date)
+
+    # Parse the data and run every stage once, so the first request only pays for what it changes
+    evaluate({})
+
+    server = HTTPServer((args.host, args.port), Handler)
+    print('Serving on http://' + args.host + ':' + str(server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
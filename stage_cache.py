@@ -0,0 +1,184 @@
+import data_store
+import file_cache
+import hashlib
+import json
+import os
+import pandas as pd
+import pickle
+import threading
+
+from functools import partial
+
+# Results of each stage kept under a hash of everything the stage read: its source and the source of the helper modules
+# it calls, the outputs of the stages it imports, the val_dict keys it looked at and the data files it loaded. A lookup
+# first finds what the stage read the last time it ran with the same source and inputs, then the result stored for the
+# current values of those reads.
+cache_folder = os.path.join(data_store.store_folder, 'stage_cache')
+
+# Size in megabytes the cache is pruned back to after each save, the oldest results going first. Set CMA_STAGE_CACHE_MB
+# to change it
+max_size = int(os.environ.get('CMA_STAGE_CACHE_MB', 2048)) * 2**20
+
+# val_dict keys, and substrings of keys, read by the stage running in the current thread
+reads = threading.local()
+
+
+class TrackedKey(str):
+    """ val_dict key handed out by TrackedDict.items, recording the substrings stage modules look for in it """
+
+    def __contains__(self, part):
+        patterns = getattr(reads, 'patterns', None)
+        if patterns is not None:
+            patterns.add(part)
+        return str.__contains__(self, part)
+
+
+class TrackedDict(dict):
+    """ val_dict recording the keys read by the stage running in the current thread """
+
+    def __getitem__(self, key):
+        keys = getattr(reads, 'keys', None)
+        if keys is not None:
+            keys.add(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        keys = getattr(reads, 'keys', None)
+        if keys is not None:
+            keys.add(key)
+        return dict.get(self, key, default)
+
+    def items(self):
+        return [(TrackedKey(k), v) for (k, v) in dict.items(self)]
+
+
+def start_tracking():
+    reads.keys, reads.patterns = set(), set()
+    data_store.access_log.reads, data_store.access_log.writes = set(), set()
+
+
+def stop_tracking():
+    """ What the stage read, as a dictionary of keys, patterns and files relative to the data folder, and the files it
+    wrote
+    """
+    written = data_store.access_log.writes
+    deps = {'keys': sorted(reads.keys), 'patterns': sorted(reads.patterns),
+            'files': sorted(os.path.relpath(x, data_store.data_folder) for x in data_store.access_log.reads
+                            if x not in written)}
+
+    reads.keys = reads.patterns = None
+    data_store.access_log.reads = data_store.access_log.writes = None
+    return deps, sorted(written)
+
+
+def fingerprint(value):
+    """ Hash of a stage output, by content for dataframes and series """
+    sha = hashlib.sha1()
+    try:
+        sha.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        sha.update(repr((getattr(value, 'columns', getattr(value, 'name', None)), value.index.names)).encode())
+    except TypeError:
+        sha.update(pickle.dumps(value))
+    return sha.hexdigest()
+
+
+def base_key(name, source, skip_sections, inputs, helpers):
+    """ Hash of a stage's source, the source of the helper modules it calls and the outputs it reads from other stages,
+    helpers as module: source and inputs as stage: {output: value}
+    """
+    sha = hashlib.sha1(json.dumps([name, sorted(skip_sections)]).encode())
+    sha.update(source.encode())
+    for module in sorted(helpers):
+        sha.update((module + helpers[module]).encode())
+    for stage in sorted(inputs):
+        for output in sorted(inputs[stage]):
+            sha.update((stage + '.' + output + fingerprint(inputs[stage][output])).encode())
+    return sha.hexdigest()
+
+
+def read_values(deps, val_dict):
+    """ Current values of the val_dict keys a stage read, including every key containing one of its patterns """
+    keys = set(deps['keys']) | {x for x in val_dict if any(y in x for y in deps['patterns'])}
+    return {x: dict.get(val_dict, x) for x in keys}
+
+
+def full_key(base, deps, val_dict):
+    """ base_key combined with the current values of what the stage read when it was last run """
+    values = read_values(deps, val_dict)
+    files = {}
+    for relative_file in deps['files']:
+        file = os.path.join(data_store.data_folder, relative_file)
+        files[relative_file] = data_store.read_file(file, file_cache.checksum) if os.path.exists(file) else None
+
+    sha = hashlib.sha1(base.encode())
+    sha.update(json.dumps([values, files], sort_keys=True, default=str).encode())
+    return sha.hexdigest()
+
+
+def index_file(name, base):
+    return os.path.join(cache_folder, name, base + '.json')
+
+
+def entry_file(name, key):
+    return os.path.join(cache_folder, name, key + '.pkl')
+
+
+def load(name, base, val_dict):
+    """ Outputs cached for a stage and what it read, restoring the files it wrote. None if nothing is cached for these
+    inputs.
+    """
+    if not os.path.exists(index_file(name, base)):
+        return None
+
+    deps = data_store.read_file(index_file(name, base), data_store.read_json)
+    file = entry_file(name, full_key(base, deps, val_dict))
+    if not os.path.exists(file):
+        return None
+
+    entry = data_store.read_file(file, pd.read_pickle)
+    for relative_file, content in entry['files'].items():
+        written = os.path.join(data_store.data_folder, relative_file)
+        if not os.path.exists(written) or file_cache.checksum(written) != hashlib.sha256(content).hexdigest():
+            data_store.write_file(written, partial(write_bytes, content))
+    return entry['outputs'], deps
+
+
+def save(name, base, deps, outputs, written, val_dict):
+    """ Cache the outputs of a stage along with the contents of the files it wrote """
+    files = {}
+    for file in written:
+        with open(file, 'rb') as f:
+            files[os.path.relpath(file, data_store.data_folder)] = f.read()
+
+    entry = {'outputs': outputs, 'files': files}
+    data_store.write_file(entry_file(name, full_key(base, deps, val_dict)), partial(pd.to_pickle, entry))
+    data_store.write_file(index_file(name, base), partial(data_store.write_json, deps))
+    prune()
+
+
+def prune(size=None):
+    """ Remove the oldest entries and indexes until the cache takes no more than size bytes, max_size by default. A
+    stage whose entry was removed runs again the next time it is needed.
+    """
+    size = max_size if size is None else size
+    files = []
+    for folder, subfolders, names in os.walk(cache_folder):
+        for file in [os.path.join(folder, x) for x in names if not x.startswith('.tmp')]:
+            try:
+                stat = os.stat(file)
+            except OSError:
+                # Removed by another process
+                continue
+            files.append((stat.st_mtime, stat.st_size, file))
+
+    total = sum(x[1] for x in files)
+    for mtime, file_size, file in sorted(files):
+        if total <= size:
+            break
+        data_store.remove_file(file)
+        total -= file_size
+
+
+def write_bytes(content, file):
+    with open(file, 'wb') as f:
+        f.write(content)
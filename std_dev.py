@@ -15,62 +15,36 @@
 
 # +
 import cma_gui as cma
+import data_store
+import ewma
 import numpy as np
 import pandas as pd
 
 from statsmodels.stats.weightstats import DescrStatsW
-
-# +
-# Exponential weight
-count = [x for x in range(240)]
-count.reverse()
-
-percent = [(1-cma.val_dict['lambda_val'])*(cma.val_dict['lambda_val']**x) for x in count]
-sum_val = sum(percent)
-
-exponential_weight = pd.Series([x / sum_val for x in percent])
 # -
+
 # # Define functions
 
 # ## Standard deviation functions
 
 
 # +
-def monthly_standard_dev(dataframe_returns, exponential_weight):
-    # Monthly variance
-    df_variance = (dataframe_returns - dataframe_returns.mean())**2 
-    func = lambda x: np.asarray(x) * np.asarray(exponential_weight)
-    df_variance = df_variance.apply(func)
-    monthly_variance = df_variance.sum()
+def exponential_moments(dataframe_returns, exponential_weight):
+    # Monthly variance around the mean and exponentially weighted mean of every column in one pass
+    returns = dataframe_returns.values.T
+    weights = exponential_weight.values.T
+    average = dataframe_returns.mean().values
+    monthly_variance = np.nansum((returns - average[:, None])**2 * weights, axis=1)
+    weighted_mean = np.nansum(returns * weights, axis=1)
 
     # Monthly standard deviation
-    monthly_std_dev = np.sqrt(monthly_variance)   
-    return monthly_std_dev
-
+    monthly_std_dev = pd.Series(np.sqrt(monthly_variance), index=dataframe_returns.columns)
 
-def exponential_std_dev(monthly_std_dev, exponential_weight, dataframe_returns):
     # Annual adjusted standard deviation
-    monthly_std_dev_list = monthly_std_dev.tolist()
-
-    adj_sd_list2 = [x**2 for x in monthly_std_dev_list]
-    sum_prod = (1 + pd.Series([dataframe_returns.iloc[:,x].values.dot(exponential_weight.values) 
-                               for x in range(len(dataframe_returns.columns))]))**2
-
-    base = [sum(x) for x in zip(sum_prod, adj_sd_list2)]
-    equation_p1 = [x**12 for x in base]
-
-    sum_prod2 = (1 + pd.Series([dataframe_returns.iloc[:,x].values.dot(exponential_weight.values) 
-                                for x in range(len(dataframe_returns.columns))]))
-
-    base_2 = sum_prod2.tolist()
-    equation_p2 = [x ** (2*12) for x in base_2]
-
-    pre_final = [x-y for x,y in zip(equation_p1, equation_p2)]
-
-    annual_adj_std_dev = pd.DataFrame(np.sqrt(pre_final))
+    annual_adj_std_dev = pd.DataFrame(np.sqrt(((1 + weighted_mean)**2 + monthly_variance)**12 - (1 + weighted_mean)**(2*12)))
     annual_adj_std_dev.index = dataframe_returns.columns
-    
-    return annual_adj_std_dev
+
+    return monthly_std_dev, annual_adj_std_dev
 
 
 # -
@@ -78,24 +52,32 @@ def exponential_std_dev(monthly_std_dev, exponential_weight, dataframe_returns):
 # ## Covariance and Correlation Matrices Functions
 
 # +
-def value_minus_mean(dataframe_returns, monthly_std_dev, exponential_weight):
+def value_minus_mean(dataframe_returns, monthly_std_dev):
     # Value Minus Mean / Standard Deviation
     average = dataframe_returns.mean()
     value_minus_mean_div_sd = (dataframe_returns.sub(average)).div(monthly_std_dev)
-    value_minus_mean_div_sd.index = exponential_weight.index
     return value_minus_mean_div_sd
 
 def exponential_correlation(value_minus_mean, exponential_weight):
-    exp_corr_raw = []
-    for x in range(len(value_minus_mean.columns)):
-        col = [(value_minus_mean.iloc[:,x]*value_minus_mean.iloc[:,i]*exponential_weight).sum() for i in range(len(value_minus_mean.columns))]
-        exp_corr_raw.append(col)
-    
+    # Weighted sum of products of every pair of columns in one matrix multiply, missing values add nothing as with .sum().
+    # Each side takes the square root of its column's weights, so two complete columns get the weights of the full window
+    values = value_minus_mean.fillna(0).values * np.sqrt(exponential_weight.values)
+    exp_corr_raw = values.T.dot(values)
+
     exp_corr = pd.DataFrame(exp_corr_raw)
     exp_corr.index = value_minus_mean.columns
     exp_corr.columns = value_minus_mean.columns
     return exp_corr
 
+def window_moments(name, dataframe_returns, exponential_weight):
+    # Complete windows are moved on from the EWMA state of the last run, windows with missing values are computed in full
+    if dataframe_returns.isna().values.any():
+        monthly_std_dev, annual_adj_std_dev = exponential_moments(dataframe_returns, exponential_weight)
+        value_minus_mean_div_sd = value_minus_mean(dataframe_returns, monthly_std_dev)
+        return monthly_std_dev, annual_adj_std_dev, exponential_correlation(value_minus_mean_div_sd, exponential_weight)
+
+    return ewma.rolling_moments(name, dataframe_returns, cma.val_dict['lambda_val'])
+
 def stand_dev_matrix(annual_adj_std_dev):
     df_annual_adj_std_dev = pd.DataFrame(annual_adj_std_dev)
     matrix_sd = df_annual_adj_std_dev.dot(df_annual_adj_std_dev.T)
@@ -115,26 +97,21 @@ fixed_us_code = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if
 alts_us_code = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'alts_us_code' in k}.values())))
 
 # Import returns
-df_returns_us = pd.read_csv('P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_us.csv', index_col=0)/100
+df_returns_us = data_store.load_returns('us')/100
+
+# Exponential weights over the months of the returns, each asset class over the months it has
+exponential_weight_us = ewma.window_weights(df_returns_us, cma.val_dict['lambda_val'])
 # -
 # ## Standard Deviations
 
 # +
-# Monthly standard deviation
-monthly_std_dev_us = monthly_standard_dev(df_returns_us, exponential_weight)
-
-# Annual adjusted standard deviation
-annual_adj_std_dev_us = exponential_std_dev(monthly_std_dev_us, exponential_weight, df_returns_us)
+# Monthly and annual adjusted standard deviations and exponential correlation
+monthly_std_dev_us, annual_adj_std_dev_us, exp_corr_us = window_moments('us', df_returns_us, exponential_weight_us)
 # -
 
 # ## Covariance and Correlation Matrices
 
 # +
-value_minus_mean_div_sd_us = value_minus_mean(df_returns_us, monthly_std_dev_us, exponential_weight)
-
-# Exponential correlation
-exp_corr_us = exponential_correlation(value_minus_mean_div_sd_us, exponential_weight)
-
 # Exponential covariance
 matrix_sd_us = stand_dev_matrix(annual_adj_std_dev_us)
 exp_cov_us = exp_corr_us.mul(matrix_sd_us, axis=0)
@@ -154,27 +131,22 @@ fixed_nonus_code = list(filter(None, list({k:v for (k,v) in cma.val_dict.items()
 alts_nonus_code = list(filter(None, list({k:v for (k,v) in cma.val_dict.items() if 'alts_nonus_code' in k}.values())))
 
 # Import returns
-df_returns_nonus = pd.read_csv('P:\\Advisory\\Research\\Automation\\CMAs\\Data\\combined_returns_nonus.csv', index_col=0)
+df_returns_nonus = data_store.load_returns('nonus')
+
+# Exponential weights over the months of the returns, each asset class over the months it has
+exponential_weight_nonus = ewma.window_weights(df_returns_nonus, cma.val_dict['lambda_val'])
 # -
 
 # ## Standard Deviations
 
 # +
-# Monthly standard deviation
-monthly_std_dev_nonus = monthly_standard_dev(df_returns_nonus, exponential_weight)
-
-# Annual adjusted standard deviation
-annual_adj_std_dev_nonus = exponential_std_dev(monthly_std_dev_nonus, exponential_weight, df_returns_nonus)
+# Monthly and annual adjusted standard deviations and exponential correlation
+monthly_std_dev_nonus, annual_adj_std_dev_nonus, exp_corr_nonus = window_moments('nonus', df_returns_nonus, exponential_weight_nonus)
 # -
 
 # ## Covariance and Correlation Matrices
 
 # +
-value_minus_mean_div_sd_nonus = value_minus_mean(df_returns_nonus, monthly_std_dev_nonus, exponential_weight)
-
-# Exponential correlation
-exp_corr_nonus = exponential_correlation(value_minus_mean_div_sd_nonus, exponential_weight)
-
 # Exponential covariance
 matrix_sd_nonus = stand_dev_matrix(annual_adj_std_dev_nonus)
 exp_cov_nonus = exp_corr_nonus.mul(matrix_sd_nonus, axis=0)
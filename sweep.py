@@ -0,0 +1,179 @@
+import itertools
+import numbers
+import pandas as pd
+import pipeline
+import report
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Stages whose outputs are linear in the building block assumptions they read, with the outputs the final tables use.
+# Keys read only by these stages are swept for every scenario at once, from the slope of each output to each key.
+linear_outputs = {
+    'equity': ['equity_returns_us', 'equity_returns_nonus'],
+    'alts': ['alts_returns_us', 'alts_returns_nonus'],
+    }
+
+# Largest difference allowed between the linear estimate and a full run of the stages
+tolerance = 1e-9
+
+
+def plain(value):
+    """ Python scalar for a numpy scalar, so swept values are stored in val_dict like the values the GUI returns """
+    return value.item() if hasattr(value, 'item') else value
+
+
+def scenarios(ranges):
+    """ Every combination of the values in a dictionary of val_dict key: values, one row per scenario """
+    keys = list(ranges)
+    values = [[plain(y) for y in ranges[x]] for x in keys]
+    return pd.DataFrame(list(itertools.product(*values)), columns=keys, dtype=object)
+
+
+def linear_keys(ranges):
+    """ Keys of ranges with numeric values that only the linear stages read """
+    import cma_gui as cma
+
+    numeric = [x for x in ranges if all(isinstance(y, numbers.Number) for y in [cma.val_dict[x]] + list(ranges[x]))]
+    return [x for x in numeric if pipeline.stages_reading([x]) <= set(linear_outputs)]
+
+
+def linear_values(outputs):
+    """ Outputs of the linear stages as one series indexed by (output, asset class) """
+    return pd.concat({y: pd.to_numeric(outputs[x][y], errors='coerce') for x in linear_outputs for y in linear_outputs[x]})
+
+
+def final_tables(outputs, values, val_dict):
+    """ Expected returns and standard deviations of every asset class for each row of values, a dataframe of linear
+    stage outputs by scenario, in the layout of the final tables
+    """
+    tables = []
+    for region, final in (('US', report.final_us), ('NonUS', report.final_nonus)):
+        base = final(outputs, val_dict)
+        suffix = region.lower()
+        expected = pd.concat([values['equity_returns_' + suffix],
+                              pd.DataFrame([outputs['fixed_income']['fixed_returns_' + suffix] * 100] * len(values),
+                                           index=values.index),
+                              values['alts_returns_' + suffix]], axis=1)
+
+        # Asset classes the final table leaves empty stay empty
+        expected = expected.reindex(columns=base.index).round(1)
+        expected.loc[:, base['Expected Return'].isna()] = float('nan')
+
+        table = expected.stack(dropna=False).rename('Expected Return').reset_index()
+        table.columns = ['Scenario', 'Asset Class', 'Expected Return']
+        table.insert(1, 'Region', region)
+        table['Standard Deviation'] = table['Asset Class'].map(base['Standard Deviation'])
+        tables.append(table)
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def linear_sweep(grid, keys, skip=()):
+    """ Linear stage outputs for each scenario in grid, varying keys from their values in cma.val_dict
+
+    The stages are run once as they are and once with each key raised by one, then every scenario is estimated from
+    the slopes. The estimate is checked against a full run of the scenario furthest from the current values, and every
+    scenario is run in full if the two differ.
+    """
+    import cma_gui as cma
+
+    start = {x: cma.val_dict[x] for x in keys}
+    base = linear_values(pipeline.run(skip=skip))
+
+    slopes = {}
+    try:
+        for key in keys:
+            cma.val_dict[key] = start[key] + 1
+            slopes[key] = linear_values(pipeline.run(skip=skip, cache=False)) - base
+            cma.val_dict[key] = start[key]
+    finally:
+        cma.val_dict.update(start)
+
+    steps = grid[keys].astype(float) - pd.Series(start, dtype=float)
+    values = pd.DataFrame([base.values] * len(grid), index=grid.index, columns=base.index)
+    if keys:
+        values += steps.values.dot(pd.DataFrame(slopes)[keys].fillna(0).T.values)
+        values.loc[:, base.isna()] = float('nan')
+
+        check = steps.abs().sum(axis=1).idxmax()
+        difference = values.loc[check] - run_scenarios(grid.loc[[check], keys], skip, cache=False).loc[check]
+        if not difference.abs().fillna(0).le(tolerance).all():
+            return run_scenarios(grid[keys], skip)
+
+    return values
+
+
+def run_scenarios(grid, skip=(), cache=True):
+    """ Linear stage outputs for each scenario in grid from a full run of the stages, one scenario after another """
+    import cma_gui as cma
+
+    start = {x: cma.val_dict[x] for x in grid}
+    values = {}
+    try:
+        for scenario, row in grid.iterrows():
+            cma.val_dict.update(row.to_dict())
+            values[scenario] = linear_values(pipeline.run(skip=skip, cache=cache))
+    finally:
+        cma.val_dict.update(start)
+    return pd.DataFrame(values).T
+
+
+def sweep_group(outer, grid, linear, skip=()):
+    """ Final table rows for a group of scenarios sharing the values of the keys not swept linearly, outer as key: value """
+    import cma_gui as cma
+
+    start = {x: cma.val_dict[x] for x in outer}
+    try:
+        cma.val_dict.update(outer)
+        values = linear_sweep(grid, linear, skip)
+        return final_tables(pipeline.run(skip=skip), values, cma.val_dict)
+    finally:
+        cma.val_dict.update(start)
+
+
+def sweep_tables(ranges, skip=('data_pull',), max_workers=1):
+    """ Generator of the sweep table for each group of scenarios sharing the values of the keys not swept linearly, in
+    the order they finish
+
+    With max_workers above one the groups are spread over worker processes. Each worker keeps the data it parses and
+    the stages a group does not change in memory for the next group, and all of them share the stage cache.
+    """
+    import cma_gui as cma
+
+    unknown = [x for x in ranges if x not in cma.val_dict]
+    if unknown:
+        raise ValueError('Unknown assumptions: ' + ', '.join(unknown))
+
+    grid = scenarios(ranges)
+    pipeline.run(skip=skip)
+    linear = linear_keys(ranges)
+    outer = [x for x in ranges if x not in linear]
+
+    groups = []
+    for outer_values, group in (grid.groupby(outer, sort=False) if outer else [((), grid)]):
+        groups.append((dict(zip(outer, outer_values if isinstance(outer_values, tuple) else [outer_values])), group))
+
+    swept = grid.infer_objects()
+    if max_workers == 1 or len(groups) == 1:
+        for outer_values, group in groups:
+            yield swept.join(sweep_group(outer_values, group, linear, skip).set_index('Scenario'), how='right')
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=pipeline.install_inputs,
+                             initargs=(cma.val_dict, cma.end_date)) as executor:
+        futures = [executor.submit(sweep_group, x, y, linear, skip) for (x, y) in groups]
+        for future in as_completed(futures):
+            yield swept.join(future.result().set_index('Scenario'), how='right')
+
+
+def sweep(ranges, skip=('data_pull',), max_workers=1):
+    """ Expected return and standard deviation of every asset class for every combination of the values in ranges
+
+    ranges is a dictionary of val_dict key: values, with values any list or range, for example
+    {'us_equity_income': np.arange(1.5, 2.51, 0.25), 'us_inflation': [2.0, 2.5]}. Keys read only by the equity and
+    alts building blocks are evaluated across the grid at once. Every other key is set in turn, re-running only the
+    stages it affects and taking unchanged stages from the stage cache, in max_workers processes. Returns a tidy
+    dataframe of scenario, the swept values, region, asset class, expected return and standard deviation.
+    """
+    table = pd.concat(list(sweep_tables(ranges, skip, max_workers)))
+    return table.rename_axis('Scenario').sort_index(kind='stable').reset_index()